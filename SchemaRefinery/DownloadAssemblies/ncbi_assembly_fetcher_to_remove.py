@@ -55,7 +55,7 @@ def main(input_table, output_directory, file_extension,
                        for line in lines[1:]
                        if line[15].strip() != '']
 
-        refseq_assemblies_ids = [url.split('/')[-1]
+        refseq_assemblies_ids = [url.rpartition('/')[2]
                                  for url in refseq_urls]
 
         print('Found URLs for {0} strains in RefSeq.'
@@ -66,11 +66,12 @@ def main(input_table, output_directory, file_extension,
     if 'genbank' in ftp:
         # get genbank urls
         # only get if sample is not in refseq list
+        refseq_urls_set = set(refseq_urls)
         genbank_urls = [line[14]
                         for line in lines[1:]
-                        if line[14].strip() != '' and line[15] not in refseq_urls]
+                        if line[14].strip() != '' and line[15] not in refseq_urls_set]
 
-        genbank_assemblies_ids = [url.split('/')[-1]
+        genbank_assemblies_ids = [url.rpartition('/')[2]
                                   for url in genbank_urls]
 
         print('Found URLs for {0} strains in GenBank.'
@@ -82,36 +83,28 @@ def main(input_table, output_directory, file_extension,
     df.download_file(assembly_summary_refseq, assembly_summary_refseq_local, retry)
     print('done.')
 
-    # open assembly_summary_refseq table 
+    # stream assembly_summary_refseq table
+    # filtering for the species given as argument
     with open(assembly_summary_refseq_local, 'r') as table1:
-        assembly_summary_lines = list(csv.reader(table1, delimiter='\t'))
+        reader = csv.reader(table1, delimiter='\t')
+        next(reader, None)
+        assembly_latest = {row[0]
+                           for row in reader
+                           if species in row[7].lower()}
 
     os.remove(assembly_summary_refseq_local)
 
-    # processing assembly_summary_refseq table
-    # filtering for the species given as argument
-    assembly_latest = []
-    for row in assembly_summary_lines[1:]:
-        if species in row[7].lower():
-            assembly_latest.append(row[0])
-
     # removing suppressed genomes from refseq_assemblies_ids and refseq_urls
-    suppressed = []
-    for i in refseq_assemblies_ids:
-        processed_id = '_'.join(i.split('_')[0:2])
-
-        if processed_id not in assembly_latest:
-            suppressed.append(refseq_assemblies_ids.index(i))
+    kept = [(assembly_id, url)
+            for assembly_id, url in zip(refseq_assemblies_ids, refseq_urls)
+            if '_'.join(assembly_id.split('_')[0:2]) in assembly_latest]
 
-    print('Found {0} ids suppressed from RefSeq.'.format(len(suppressed)))
+    print('Found {0} ids suppressed from RefSeq.'
+          ''.format(len(refseq_assemblies_ids) - len(kept)))
 
     # remove suppressed from lists
-    refseq_assemblies_ids = [j
-                             for i, j in enumerate(refseq_assemblies_ids)
-                             if i not in suppressed]
-    refseq_urls = [j
-                   for i, j in enumerate(refseq_urls)
-                   if i not in suppressed]
+    refseq_assemblies_ids = [assembly_id for assembly_id, _ in kept]
+    refseq_urls = [url for _, url in kept]
 
     urls = refseq_urls + genbank_urls
     assemblies_ids = refseq_assemblies_ids + genbank_assemblies_ids
@@ -146,6 +139,8 @@ def main(input_table, output_directory, file_extension,
             else:
                 success += 1
                 print('\r', 'Downloaded {0}/{1}'.format(success, files_number), end='')
+    # Close the connections kept open by the download threads
+    df.close_all_connections()
 
     print('\nFailed download for {0} files.'.format(len(failures)))
 
@@ -158,8 +153,9 @@ def main(input_table, output_directory, file_extension,
           ''.format(files_number-len(failures),
                     files_number, minutes, seconds))
     
-    with open(os.path.join(output_directory,"assemblies_ids_ncbi.tsv"),'w+') as ids_to_tsv:
-        ids_to_tsv.write("\n".join(map(str, assemblies_ids)))
+    with open(os.path.join(output_directory,"assemblies_ids_ncbi.tsv"),'wb', buffering=1 << 20) as ids_to_tsv:
+        ids_to_tsv.write(b"\n".join(assembly_id.encode()
+                                    for assembly_id in assemblies_ids))
 
 
 def parse_arguments():
@@ -11,7 +11,7 @@ except ModuleNotFoundError:
     
 def main(schema, output_directory, allelecall_directory, alignment_ratio_threshold_gene_fusions, 
         pident_threshold_gene_fusions, clustering_sim, clustering_cov, genome_presence,
-        size_threshold, translation_table, cpu):
+        size_threshold, translation_table, cpu, resume = False):
     
     temp_paths = [os.path.join(allelecall_directory, "temp"), 
                       os.path.join(allelecall_directory, "unclassified_sequences.fasta"),
@@ -33,4 +33,4 @@ def main(schema, output_directory, allelecall_directory, alignment_ratio_thresho
     print("Identifying genes fusions...")
     unclassified_cds_output = os.path.join(output_directory, "unclassified_cds")
     cof.classify_cds(schema, unclassified_cds_output, allelecall_directory,
-                constants, temp_paths, cpu)
\ No newline at end of file
+                constants, temp_paths, cpu, resume)
\ No newline at end of file
@@ -381,7 +381,7 @@ def run_blast_representatives_vs_alleles_multiprocessing(locus_alignment_pairs_l
     allele_alignments_string_list = []
 
     for alignment_pair in alignments_pair_list:
-        alignment_before_underscore = alignment_pair[1].split('_')[0]
+        alignment_before_underscore = alignment_pair[1].partition('_')[0]
         key_to_process = f"{alignment_pair[0]};{alignment_pair[1]}"
 
         if not key_to_process in alignments_dict_allele:
@@ -437,7 +437,7 @@ def split_dict_into_clusters(clustered_loci, processed_representatives_dict):
         loci = list(loci)
         new_dict = {}
         for key_pair in list(processed_representatives_dict.keys()):
-            if any(key.split("_")[0] in loci for key in key_pair.split(";")):
+            if any(key.partition("_")[0] in loci for key in key_pair.split(";")):
                 new_dict[key_pair] = processed_representatives_dict[key_pair]
                 del processed_representatives_dict[key_pair]
 
@@ -525,7 +525,7 @@ def run_blast_for_all_representatives(loci, representative_file_dict, all_repres
     unique_alignment_ids = set()
     for key in all_representatives_alignments_dict.keys():
         for locus in key.split(";"):
-            unique_alignment_ids.add(locus.split('_')[0])
+            unique_alignment_ids.add(locus.partition('_')[0])
 
     print(f"Total of {len(unique_alignment_ids)} loci had alignments with "
           "other loci with the chosen thresholds.")
@@ -15,6 +15,8 @@ Code documentation
 
 
 import os
+import sys
+import concurrent.futures
 from functools import reduce
 
 import pandas as pd
@@ -30,11 +32,36 @@ except ModuleNotFoundError:
     from SchemaRefinery.SchemaAnnotation import (proteome_fetcher as pf,
                                                 proteome_splitter as ps,
                                                 proteome_matcher as pm,
-                                                enbank_annotations as ga,
+                                                genbank_annotations as ga,
                                                 match_schemas as ms)
     from SchemaRefinery.utils import file_functions as ff
 
 
+def read_annotation_file(file):
+    """
+    Reads an annotation TSV file, the 'Locus_ID' column is renamed to
+    'Locus' if the file does not have a 'Locus' column.
+
+    Parameters
+    ----------
+    file : str
+        Path to the annotation TSV file.
+
+    Returns
+    -------
+    current_df : pandas.DataFrame
+        The annotations with all of the columns as str.
+    """
+    # Empty files are reported here, pandas would fail with a less clear error.
+    if os.stat(file).st_size == 0:
+        sys.exit(f"\nError: The annotation file {file} is empty.")
+    current_df = pd.read_csv(file, delimiter='\t', dtype=str)
+    if 'Locus' not in current_df.columns:
+        current_df = current_df.rename({'Locus_ID': 'Locus'}, axis=1)
+
+    return current_df
+
+
 def main(args):
 
     ff.create_directory(args.output_directory)
@@ -78,13 +105,10 @@ def main(args):
                                            args.cpu_cores)
         results_files.append(matched_schemas)
 
-    # Merge all results into a single file
-    dfs = []
-    for file in results_files:
-        current_df = pd.read_csv(file, delimiter='\t', dtype=str)
-        if 'Locus' not in current_df.columns:
-            current_df = current_df.rename({'Locus_ID': 'Locus'}, axis=1)
-        dfs.append(current_df)
+    # Merge all results into a single file, the files are read concurrently
+    # and kept in the same order.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.cpu_cores) as executor:
+        dfs = list(executor.map(read_annotation_file, results_files))
 
     if args.subject_annotations and matched_schemas:
         # Read TSV with subject schema annotations
@@ -101,7 +125,8 @@ def main(args):
         # Merge columns so that both table to add and reference have locus_ID
         merged_match = pd.merge(match_add, dfs[-1], on='Locus',
                                 how='left').fillna('')
-        merged_match = merged_match[merged_match.columns.tolist()[1:]]
+        # Drop the first column with a positional slice
+        merged_match = merged_match.iloc[:, 1:]
 
         dfs[-1] = merged_match
 
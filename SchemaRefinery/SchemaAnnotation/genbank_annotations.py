@@ -18,12 +18,16 @@ import csv
 from Bio import SeqIO
 
 try:
-    from utils import blast_functions as bf
-    from utils.sequence_functions import translate_sequence
+    from utils import (blast_functions as bf,
+                       linux_functions as lf)
+    from utils.sequence_functions import (translate_sequence,
+                                          read_fasta_file_bytes)
     from utils import file_functions as ff
 except ModuleNotFoundError:
-    from SchemaRefinery.utils import blast_functions as bf
-    from SchemaRefinery.utils.sequence_functions import translate_sequence
+    from SchemaRefinery.utils import (blast_functions as bf,
+                                      linux_functions as lf)
+    from SchemaRefinery.utils.sequence_functions import (translate_sequence,
+                                                         read_fasta_file_bytes)
     from SchemaRefinery.utils import file_functions as ff
 
 
@@ -99,19 +103,21 @@ def genbank_annotations(genbank_files: str, schema_directory: str,
 
     # BLAST alleles for each locus against file with all CDSs from origin genomes
     reps_dir = os.path.join(schema_directory, 'short')
-    rep_files = [os.path.join(reps_dir, f)
-                 for f in os.listdir(reps_dir)
-                 if f.endswith('.fasta')]
+    with os.scandir(reps_dir) as entries:
+        rep_files = [entry.path
+                     for entry in entries
+                     if entry.name.endswith('.fasta') and entry.is_file()]
 
     # Get all representative sequences into same file
     reps = []
     reps_ids = {}
     start = 1
     for f in rep_files:
-        first_rep =  SeqIO.parse(f, 'fasta').__next__()
-        prot = translate_sequence(str(first_rep.seq), 11)
+        # Only the first record is parsed
+        first_rep_id, first_rep_seq = next(read_fasta_file_bytes(f))
+        prot = translate_sequence(first_rep_seq.decode(), 11)
         sequence = '>{0}\n{1}'.format(start, prot)
-        reps_ids[start] = first_rep.id
+        reps_ids[start] = first_rep_id
         reps.append(sequence)
         start += 1
 
@@ -122,7 +128,8 @@ def genbank_annotations(genbank_files: str, schema_directory: str,
 
     # Create BLASTdb
     blastdb_path = os.path.join(output_directory, 'reps_db')
-    bf.make_blast_db(prot_file, blastdb_path, 'prot')
+    makeblastdb_exec = lf.get_tool_path('makeblastdb')
+    bf.make_blast_db(makeblastdb_exec, prot_file, blastdb_path, 'prot')
 
     blastout = os.path.join(output_directory, 'blastout.tsv')
     bf.run_blast('blastp', blastdb_path, selected_file, blastout,
@@ -142,7 +149,7 @@ def genbank_annotations(genbank_files: str, schema_directory: str,
     best_matches = {}
     for rec in blast_results:
         try:
-            query = rec[0].split('|')[0]
+            query = rec[0].partition('|')[0]
             subject = rec[1]
             score = rec[-1]
             query_name = selected_inverse[query][1]
@@ -194,7 +201,7 @@ def genbank_annotations(genbank_files: str, schema_directory: str,
     header = 'Locus\tgenebank_origin_id\tgenebank_origin_product\tgenebank_origin_name\tgenebank_origin_bsr'
     annotations_file = os.path.join(output_directory, 'genbank_annotations.tsv')
     with open(annotations_file, 'w') as at:
-        outlines = [header] + ['{0}\t{1}\t{2}\t{3}\t{4}'.format(k.split("_")[0], v[0], v[3], v[4], v[5]) for k, v in final_best_matches.items()]
+        outlines = [header] + ['{0}\t{1}\t{2}\t{3}\t{4}'.format(k.partition("_")[0], v[0], v[3], v[4], v[5]) for k, v in final_best_matches.items()]
         outtext = '\n'.join(outlines)
         at.write(outtext+'\n')
 
@@ -15,18 +15,23 @@ Code documentation
 import os
 import csv
 import itertools
-
-from Bio import SeqIO
+import concurrent.futures
+from itertools import repeat
+from collections import defaultdict
 
 try:
     from utils.file_functions import create_directory
     from utils.blast_functions import make_blast_db, run_blast
-    from utils.sequence_functions import translate_sequence
+    from utils.linux_functions import get_tool_path
+    from utils.sequence_functions import (translate_sequence,
+                                          read_fasta_file_bytes)
 
 except ModuleNotFoundError:
     from SchemaRefinery.utils.file_functions import create_directory
     from SchemaRefinery.utils.blast_functions import make_blast_db, run_blast
-    from SchemaRefinery.utils.sequence_functions import translate_sequence
+    from SchemaRefinery.utils.linux_functions import get_tool_path
+    from SchemaRefinery.utils.sequence_functions import (translate_sequence,
+                                                         read_fasta_file_bytes)
 
 
 def read_tabular(input_file, delimiter='\t'):
@@ -54,6 +59,35 @@ def read_tabular(input_file, delimiter='\t'):
     return lines
 
 
+def iter_top_hits(blast_output):
+    """ Iterate over the best HSP of each query and subject pair
+    in a BLAST tabular output file.
+
+    Parameters
+    ----------
+    blast_output : str
+        Path to the BLAST output file with the query identifier,
+        subject identifier and raw score in the first columns
+        and the last column.
+
+    Yields
+    ------
+    hit : tuple
+        Query identifier, subject identifier and raw score of
+        the first HSP reported for each pair. BLAST reports the
+        HSPs of a pair contiguously and sorted by score.
+    """
+
+    last_pair = None
+    with open(blast_output, 'r') as infile:
+        for line in infile:
+            fields = line.rstrip('\n').split('\t')
+            pair = (fields[0], fields[1])
+            if pair != last_pair:
+                last_pair = pair
+                yield fields[0], fields[1], fields[-1]
+
+
 def flatten_list(list_to_flatten):
     """ Flattens one level of a nested list.
 
@@ -73,6 +107,81 @@ def flatten_list(list_to_flatten):
     return flattened_list
 
 
+def get_schema_files(schema_directory):
+    """ Get the paths to the FASTA files in a schema directory.
+
+    Parameters
+    ----------
+    schema_directory : str
+        Path to the schema directory (or to its 'short' directory).
+
+    Returns
+    -------
+    fasta_files : list
+        List with the paths to the FASTA files in the directory.
+    """
+
+    with os.scandir(schema_directory) as entries:
+        fasta_files = [entry.path
+                       for entry in entries
+                       if entry.name.endswith('.fasta') and entry.is_file()]
+
+    return fasta_files
+
+
+def translate_representative(fasta_file, translation_table):
+    """ Translate the first representative allele of a locus.
+
+    Parameters
+    ----------
+    fasta_file : str
+        Path to the FASTA file with the locus representatives.
+    translation_table : int
+        Translation table identifier.
+
+    Returns
+    -------
+    short_seqid : str
+        Identifier of the representative, composed of the locus
+        identifier and the allele identifier.
+    protein : str
+        Protein sequence of the representative.
+    """
+
+    locus_id = os.path.basename(fasta_file).partition('_short')[0]
+    # Only get the first representative allele
+    seqid, sequence = next(read_fasta_file_bytes(fasta_file))
+    allele_id = seqid.rpartition('_')[2]
+    short_seqid = '{0}_{1}'.format(locus_id, allele_id)
+    protein = str(translate_sequence(sequence.decode(), translation_table))
+
+    return short_seqid, protein
+
+
+def translate_schema_file(fasta_file, translation_table):
+    """ Translate all alleles in a schema FASTA file.
+
+    Parameters
+    ----------
+    fasta_file : str
+        Path to the locus FASTA file.
+    translation_table : int
+        Translation table identifier.
+
+    Returns
+    -------
+    translations : list
+        List with a tuple per allele, containing the allele
+        identifier and the protein sequence.
+    """
+
+    translations = [(seqid, str(translate_sequence(sequence.decode(),
+                                                   translation_table)))
+                    for seqid, sequence in read_fasta_file_bytes(fasta_file)]
+
+    return translations
+
+
 def match_schemas(query_schema, subject_schema, output_path, blast_score_ratio, cpu_cores):
 
     output_path = os.path.join(output_path, 'matchSchemas')
@@ -80,22 +189,28 @@ def match_schemas(query_schema, subject_schema, output_path, blast_score_ratio,
 
     # Import representative sequences in query schema
     rep_dir = os.path.join(query_schema, 'short')
-    rep_files = [os.path.join(rep_dir, f)
-                 for f in os.listdir(rep_dir)
-                 if f.endswith('.fasta')]
+    rep_files = get_schema_files(rep_dir)
 
     # Get representative sequences from query schema
-    query_ids = [os.path.basename(f).split('_')[0] for f in rep_files]
+    chunksize = max(1, len(rep_files) // (cpu_cores * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=cpu_cores) as executor:
+        translated_reps = list(executor.map(translate_representative, rep_files,
+                                            repeat(11), chunksize=chunksize))
+
     query_reps = []
-    for f in rep_files:
-        locus_id = os.path.basename(f).split('_short')[0]
-        records = SeqIO.parse(f, 'fasta')
-        # Only get the first representative allele
-        rec = next(records, None)
-        seqid = rec.id
-        allele_id = seqid.split('_')[-1]
-        short_seqid = '{0}_{1}'.format(locus_id, allele_id)
-        prot = translate_sequence(str(rec.seq), 11)
+    # Map representative identifiers to their locus identifiers once
+    query_loci = {}
+    # Identical proteins are only aligned once, the results of the
+    # first representative are shared with the other ones
+    query_proteins = {}
+    query_groups = {}
+    for short_seqid, prot in translated_reps:
+        query_loci[short_seqid] = short_seqid.partition('_')[0]
+        rep_seqid = query_proteins.setdefault(prot, short_seqid)
+        if rep_seqid != short_seqid:
+            query_groups[rep_seqid].append(short_seqid)
+            continue
+        query_groups[short_seqid] = [short_seqid]
         sequence = '>{0}\n{1}'.format(short_seqid, prot)
         query_reps.append(sequence)
 
@@ -106,7 +221,8 @@ def match_schemas(query_schema, subject_schema, output_path, blast_score_ratio,
 
     # Create BLAST db with query sequences and get self scores
     query_blastdb_path = os.path.join(output_path, 'query_blastdb')
-    make_blast_db(query_prot_file, query_blastdb_path, 'prot')
+    makeblastdb_exec = get_tool_path('makeblastdb')
+    make_blast_db(makeblastdb_exec, query_prot_file, query_blastdb_path, 'prot')
 
     # Determine self raw score for representative sequences
     self_blast_out = os.path.join(output_path, 'self_results.tsv')
@@ -116,66 +232,98 @@ def match_schemas(query_schema, subject_schema, output_path, blast_score_ratio,
     run_blast('blastp', query_blastdb_path, query_prot_file, self_blast_out,
               max_hsps=1, threads=cpu_cores, max_targets=5)
 
-    self_blast_results = read_tabular(self_blast_out)
-    self_blast_results = {r[0].split('_')[0]: r[2]
-                          for r in self_blast_results
-                          if r[0] == r[1]}
+    self_blast_results = {query_loci[query]: score
+                          for query, subject, score
+                          in iter_top_hits(self_blast_out)
+                          if query == subject}
+    for rep_seqid, group in query_groups.items():
+        rep_locus = query_loci[rep_seqid]
+        if rep_locus in self_blast_results:
+            for seqid in group[1:]:
+                self_blast_results[query_loci[seqid]] = self_blast_results[rep_locus]
 
     # Translate subject sequences
-    subject_files = [os.path.join(subject_schema, f)
-                     for f in os.listdir(subject_schema)
-                     if f.endswith('.fasta') is True]
+    subject_files = get_schema_files(subject_schema)
 
     subject_prots_file = os.path.join(output_path, 'subject_prots.fasta')
-    ids = {}
-    start = 1
-    for file in subject_files:
-        records = [(rec.id, str(rec.seq))
-                   for rec in SeqIO.parse(file, 'fasta')]
-        for rec in records:
-            ids[rec[0]] = start
-            start += 1
-        sequences = ['>{0}\n{1}'.format(ids[rec[0]],
-                                        translate_sequence(rec[1], 11))
-                     for rec in records]
-        with open(subject_prots_file, 'a') as sf:
-            sf.write('\n'.join(sequences)+'\n')
+    # Identical proteins, also from different loci, are only written
+    # once. Unique proteins are identified in the BLASTdb by their
+    # position (starting at 1) in this list, which stores the alleles
+    # that code for each protein
+    subject_alleles = []
+    subject_proteins = {}
+    subject_loci = {}
+    # Loci are translated in parallel, results are consumed in order
+    chunksize = max(1, len(subject_files) // (cpu_cores * 4))
+    # Output file is truncated and kept open while loci are translated
+    with open(subject_prots_file, 'w', buffering=1 << 20) as sf, \
+         concurrent.futures.ProcessPoolExecutor(max_workers=cpu_cores) as executor:
+        for records in executor.map(translate_schema_file, subject_files,
+                                    repeat(11), chunksize=chunksize):
+            sequences = []
+            for seqid, prot in records:
+                subject_loci[seqid] = seqid.partition('_')[0]
+                index = subject_proteins.setdefault(prot, len(subject_alleles))
+                if index < len(subject_alleles):
+                    subject_alleles[index].append(seqid)
+                    continue
+                subject_alleles.append([seqid])
+                sequences.append('>{0}\n{1}\n'.format(len(subject_alleles), prot))
+            sf.write(''.join(sequences))
 
     # Create BLASTdb with subject sequences
     blastdb_path = os.path.join(output_path, 'subject_blastdb')
-    make_blast_db(subject_prots_file, blastdb_path, 'prot')
+    make_blast_db(makeblastdb_exec, subject_prots_file, blastdb_path, 'prot')
 
     # BLASTp old seqs against new seqs
     blast_out = os.path.join(output_path, 'results.tsv')
+    max_targets = 10
     run_blast('blastp', blastdb_path, query_prot_file, blast_out,
-              max_hsps=1, threads=cpu_cores, ids_file=None, max_targets=10)
-
-    # Import BLAST results
-    blast_results = read_tabular(blast_out)
+              max_hsps=1, threads=cpu_cores, ids_file=None, max_targets=max_targets)
 
-    ids_rev = {v: k for k, v in ids.items()}
+    # Self-score and minimum raw score to reach the BSR threshold
+    # for each aligned representative
+    score_limits = {}
+    for rep_seqid in query_groups:
+        rep_locus = query_loci[rep_seqid]
+        if rep_locus in self_blast_results:
+            self_score = float(self_blast_results[rep_locus])
+            score_limits[rep_seqid] = (self_score, blast_score_ratio * self_score)
 
     # Determine BSR values
     bsr_values = {}
-    multiple_matches = {}
-    for m in blast_results:
-        query = m[0].split('_')[0]
-        subject = ids_rev[int(m[1])]
-        score = m[-1]
-        bsr = float(score) / float(self_blast_results[query])
-        if query in bsr_values:
-            if bsr > bsr_values[query][1]:
-                bsr_values[query] = [subject, bsr]
-            if bsr > blast_score_ratio:
-                multiple_matches[query].append([subject, bsr])
-        elif query not in bsr_values and bsr > blast_score_ratio:
-            bsr_values[query] = [subject, bsr]
-            multiple_matches[query] = [[subject, bsr]]
+    multiple_matches = defaultdict(list)
+    # Number of subject alleles matched by each representative, hits are
+    # expanded to at most max_targets alleles in BLAST order, as if each
+    # allele was a separate target
+    targets_count = defaultdict(int)
+    # Stream BLAST results, keeping only the best HSP per pair
+    for rep_seqid, subject, score in iter_top_hits(blast_out):
+        self_score, min_score = score_limits[rep_seqid]
+        score = float(score)
+        remaining_targets = max_targets - targets_count[rep_seqid]
+        if remaining_targets <= 0:
+            continue
+        subjects = subject_alleles[int(subject)-1][:remaining_targets]
+        targets_count[rep_seqid] += len(subjects)
+        # Only hits above the BSR threshold are kept, the raw score
+        # is compared before computing the BSR
+        if score > min_score:
+            bsr = score / self_score
+            # Share the hit with representatives that had the same protein
+            # and with all subject alleles that code for the protein
+            for seqid in query_groups[rep_seqid]:
+                query = query_loci[seqid]
+                multiple_matches[query].extend([subject, bsr]
+                                               for subject in subjects)
+                best = bsr_values.get(query)
+                if best is None or bsr > best[1]:
+                    bsr_values[query] = [subjects[0], bsr]
 
     # Keep only queries with multiple matches
     multiple = []
     for k, v in multiple_matches.items():
-        loci = [e[0].split('_')[0] for e in v]
+        loci = [subject_loci[e[0]] for e in v]
         if len(set(loci)) > 1:
             matches = ['{0}\t{1}\t{2}'.format(k, e[0], e[1]) for e in v]
             multiple.extend(matches)
@@ -188,7 +336,7 @@ def match_schemas(query_schema, subject_schema, output_path, blast_score_ratio,
 
     # Save matches between schemas loci
     header = ['Locus_ID\tLocus\tBSR']
-    matches = ['{0}\t{1}\t{2}'.format(k, v[0].split('_')[0], v[1])
+    matches = ['{0}\t{1}\t{2}'.format(k, subject_loci[v[0]], v[1])
                for k, v in bsr_values.items()]
     matches_lines = '\n'.join(header+matches)
     matches_file = os.path.join(output_path, 'matches.tsv')
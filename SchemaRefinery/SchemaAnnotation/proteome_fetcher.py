@@ -20,11 +20,11 @@ import concurrent.futures
 from itertools import repeat
 
 try:
-    from utils.download_functions import download_file
+    from utils.download_functions import download_file, close_all_connections
     from utils.file_functions import create_directory
     from utils.constants import SOCKET_TIMEOUT, PROTEOME_TEMPLATE_URL
 except ModuleNotFoundError:
-    from SchemaRefinery.utils.download_functions import download_file
+    from SchemaRefinery.utils.download_functions import download_file, close_all_connections
     from SchemaRefinery.utils.file_functions import create_directory
     from SchemaRefinery.utils.constants import SOCKET_TIMEOUT, PROTEOME_TEMPLATE_URL
 
@@ -73,6 +73,8 @@ def proteome_fetcher(proteome_table: str, output_directory: str, threads: int,
             else:
                 success += 1
                 print('\r', 'Downloaded {0}/{1}'.format(success, num_proteomes), end='')
+    # Close the connections kept open by the download threads
+    close_all_connections()
 
     print(f'\nFailed download for {len(failures)} proteomes.')
 
@@ -14,17 +14,40 @@ Code documentation
 """
 
 import os
-import csv
 import pickle
 
-from Bio import SeqIO
-
 try:
-    from utils import blast_functions as bf
-    from utils.sequence_functions import translate_sequence
+    from utils import (blast_functions as bf,
+                       linux_functions as lf)
+    from utils.sequence_functions import (translate_sequence,
+                                          read_fasta_file_bytes)
 except ModuleNotFoundError:
-    from SchemaRefinery.utils import blast_functions as bf
-    from SchemaRefinery.utils.sequence_functions import translate_sequence
+    from SchemaRefinery.utils import (blast_functions as bf,
+                                      linux_functions as lf)
+    from SchemaRefinery.utils.sequence_functions import (translate_sequence,
+                                                         read_fasta_file_bytes)
+
+
+def iter_blast_results(blast_output):
+    """ Iterate over the alignments in a BLAST tabular output file.
+
+    Parameters
+    ----------
+    blast_output : str
+        Path to the BLAST output file with the query identifier,
+        subject identifier and raw score in the first columns
+        and the last column.
+
+    Yields
+    ------
+    alignment : tuple
+        Query identifier, subject identifier and raw score.
+    """
+
+    with open(blast_output, 'r') as infile:
+        for line in infile:
+            fields = line.rstrip('\n').split('\t')
+            yield fields[0], fields[1], fields[-1]
 
 
 # proteome_files: TrEMBL FASTA, Swiss-Prot FASTA and descriptions pickle
@@ -33,19 +56,19 @@ def proteome_matcher(schema_directory: str, proteome_files: list,
                      bsr: float):
 
     reps_dir = os.path.join(schema_directory, 'short')
-    rep_files = [os.path.join(reps_dir, f)
-                 for f in os.listdir(reps_dir)
-                 if f.endswith('.fasta')]
+    with os.scandir(reps_dir) as entries:
+        rep_files = [entry.path
+                     for entry in entries
+                     if entry.name.endswith('.fasta') and entry.is_file()]
 
     # Translate representative alleles and save to single FASTA file
     translated_reps = []
     for f in rep_files:
-        locus_id = os.path.basename(f).split('_short')[0]
-        for rec in SeqIO.parse(f, 'fasta'):
-            seqid = rec.id
-            allele_id = seqid.split('_')[-1]
+        locus_id = os.path.basename(f).partition('_short')[0]
+        for seqid, sequence in read_fasta_file_bytes(f):
+            allele_id = seqid.rpartition('_')[2]
             short_seqid = '{0}_{1}'.format(locus_id, allele_id)
-            prot = translate_sequence(str(rec.seq), 11)
+            prot = translate_sequence(sequence.decode(), 11)
             prot_record = '>{0}\n{1}'.format(short_seqid, prot)
             translated_reps.append(prot_record)
 
@@ -54,11 +77,14 @@ def proteome_matcher(schema_directory: str, proteome_files: list,
     with open(prot_file, 'w') as pinfile:
         pinfile.write(ouput_text+'\n')
 
+    makeblastdb_exec = lf.get_tool_path('makeblastdb')
+
     # BLASTp TrEMBL and Swiss-Prot records
     # Create TrEMBL BLASTdb
     tr_file = proteome_files[0]
     tr_blastdb_path = os.path.join(output_directory, 'tr_BLASTdb')
-    tr_blastdb_stderr = bf.make_blast_db(tr_file, tr_blastdb_path, 'prot')
+    # Reuse BLASTdbs created in previous runs with the same proteome files
+    bf.make_blast_db_if_changed(makeblastdb_exec, tr_file, tr_blastdb_path, 'prot')
     tr_blastout = os.path.join(output_directory, 'tr_blastout.tsv')
     tr_blast_stderr = bf.run_blast('blastp', tr_blastdb_path, prot_file,
                                    tr_blastout, max_hsps=1, threads=cpu_cores,
@@ -67,7 +93,7 @@ def proteome_matcher(schema_directory: str, proteome_files: list,
     # Create Swiss-Prot BLASTdb
     sp_file = proteome_files[1]
     sp_blastdb_path = os.path.join(output_directory, 'sp_db')
-    sp_blastdb_stderr = bf.make_blast_db(sp_file, sp_blastdb_path, 'prot')
+    bf.make_blast_db_if_changed(makeblastdb_exec, sp_file, sp_blastdb_path, 'prot')
     sp_blastout = os.path.join(output_directory, 'sp_blastout.tsv')
     sp_blast_stderr = bf.run_blast('blastp', sp_blastdb_path, prot_file,
                                    sp_blastout, max_hsps=1, threads=cpu_cores,
@@ -75,44 +101,34 @@ def proteome_matcher(schema_directory: str, proteome_files: list,
 
     # Self BLASTp to get representatives self scores
     reps_blastdb_path = os.path.join(output_directory, 'reps_db')
-    reps_blastdb_stderr = bf.make_blast_db(prot_file, reps_blastdb_path, 'prot')
+    reps_blastdb_stderr = bf.make_blast_db(makeblastdb_exec, prot_file, reps_blastdb_path, 'prot')
     reps_self_blastout = os.path.join(output_directory, 'reps_self_blastout.tsv')
     reps_blast_stderr = bf.run_blast('blastp', reps_blastdb_path, prot_file,
                                      reps_self_blastout, max_hsps=1, threads=cpu_cores,
                                      max_targets=10)
 
     # Import self_results
-    with open(reps_self_blastout, 'r') as at:
-        results = list(csv.reader(at, delimiter='\t'))
-
-    self_scores = {line[0]: line[-1] for line in results if line[0] == line[1]}
+    # Self-scores are converted and loci identifiers determined once
+    # per representative instead of once per alignment
+    self_scores = {query: float(score)
+                   for query, subject, score in iter_blast_results(reps_self_blastout)
+                   if query == subject}
+    query_loci = {query: query.partition('_')[0] for query in self_scores}
 
     # Import Swiss-Prot and TrEMBL records descriptions
     with open(proteome_files[2], 'rb') as dinfile:
         descriptions = pickle.load(dinfile)
 
     # Get TrEMBL and Swiss-Prot results and choose only highest-score matches
-    with open(tr_blastout, 'r') as at:
-        tr_lines = list(csv.reader(at, delimiter='\t'))
-
     # TrEMBL
     tr_results = {}
-    for line in tr_lines:
-        query = line[0]
-        subject = line[1]
-        score = line[-1]
-        self_score = self_scores[query]
-        match_bsr = float(score) / float(self_score)
-        locus = query.split('_')[0]
-        tr_results.setdefault(locus, []).append([subject, match_bsr])
-
-    # Select only best hit
-    for k, v in tr_results.items():
-        if len(v) > 1:
-            sorted_v = sorted(v, key=lambda x: float(x[1]), reverse=True)
-            tr_results[k] = sorted_v[0]
-        else:
-            tr_results[k] = v[0]
+    for query, subject, score in iter_blast_results(tr_blastout):
+        match_bsr = float(score) / self_scores[query]
+        locus = query_loci[query]
+        # Keep only the best hit
+        best = tr_results.get(locus)
+        if best is None or match_bsr > best[1]:
+            tr_results[locus] = [subject, match_bsr]
 
     # Get short and long names from description
     tr_selected = {k: v for k, v in tr_results.items() if v[1] >= bsr}
@@ -122,27 +138,14 @@ def proteome_matcher(schema_directory: str, proteome_files: list,
         sname = desc.split('GN=')[1].split(' PE=')[0]
         tr_selected[k] = v + [lname, sname]
 
-    # Swiss-Prot
-    with open(sp_blastout, 'r') as at:
-        sp_lines = list(csv.reader(at, delimiter='\t'))
-
     # Swiss-Prot
     sp_results = {}
-    for line in sp_lines:
-        query = line[0]
-        subject = line[1]
-        score = line[-1]
-        self_score = self_scores[query]
-        match_bsr = float(score) / float(self_score)
-        locus = query.split('_')[0]
-        sp_results.setdefault(locus, []).append([subject, match_bsr])
-
-    for k, v in sp_results.items():
-        if len(v) > 1:
-            sorted_v = sorted(v, key=lambda x: float(x[1]), reverse=True)
-            sp_results[k] = sorted_v[0]
-        else:
-            sp_results[k] = v[0]
+    for query, subject, score in iter_blast_results(sp_blastout):
+        match_bsr = float(score) / self_scores[query]
+        locus = query_loci[query]
+        best = sp_results.get(locus)
+        if best is None or match_bsr > best[1]:
+            sp_results[locus] = [subject, match_bsr]
 
     sp_selected = {k: v for k, v in sp_results.items() if v[1] >= bsr}
     for k, v in sp_selected.items():
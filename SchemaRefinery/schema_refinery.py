@@ -258,6 +258,12 @@ def unclassified_cds():
                     default=1, 
                     help='Number of cpus to run blast instances.')
 
+     parser.add_argument('-r', '--resume', action='store_true',
+                    required=False, dest='resume',
+                    help='Save the results of slow steps and reuse the '
+                    'ones saved by a previous run with this option for '
+                    'steps whose inputs did not change.')
+
      args = parser.parse_args()
 
      del args.RefineSchema
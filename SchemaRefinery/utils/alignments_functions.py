@@ -260,8 +260,8 @@ def process_blast_results(blast_results_file, constants_threshold):
             
             # Review this code in pralagous finder, in gene fusions it cuts all
             # GCF_ named isolate from analysis!
-            query_before_underscore = query.split("_")[0]
-            subject_before_underscore = subject.split("_")[0]
+            query_before_underscore = query.partition("_")[0]
+            subject_before_underscore = subject.partition("_")[0]
 
             if query_before_underscore == subject_before_underscore:
                 del filtered_alignments_dict[key]
@@ -342,90 +342,83 @@ def get_alignments_dict_from_blast_results(blast_results_file, pident_threshold,
     pattern = '_(\d+)'
     self_score = 0
     with open(blast_results_file, "r") as f:
-        lines = f.readlines()
-        i = 1
-        for line in lines:
+        # Stream the lines and convert each column only once.
+        for line in f:
             # Extract the columns into the variables
-            cols = line.replace('\n', '').split("\t")
+            cols = line.rstrip('\n').split("\t")
             query = cols[0]
             subject = cols[1]
-            query_length = cols[2]
-            subject_length = cols[3]
-            query_start = cols[4]
-            query_end = cols[5]
-            subject_start = cols[6]
-            subject_end = cols[7]
-            length = cols[8]
-            score = cols[9]
-            gaps = cols[10]
-            pident = cols[11]
+            query_start = int(cols[4])
+            query_end = int(cols[5])
+            subject_start = int(cols[6])
+            subject_end = int(cols[7])
+            score = int(cols[9])
+            pident = float(cols[11])
             # Save the dict
             value = {
                     "query": query,
                     "subject": subject,
-                    "query_length": int(query_length),
-                    "subject_length": int(subject_length),
-                    "query_start": int(query_start),
-                    "query_end": int(query_end),
-                    "subject_start": int(subject_start),
-                    "subject_end": int(subject_end),
-                    "length": int(length),
-                    "score": int(score),
-                    "gaps": int(gaps),
-                    "pident": float(pident)
+                    "query_length": int(cols[2]),
+                    "subject_length": int(cols[3]),
+                    "query_start": query_start,
+                    "query_end": query_end,
+                    "subject_start": subject_start,
+                    "subject_end": subject_end,
+                    "length": int(cols[8]),
+                    "score": score,
+                    "gaps": int(cols[10]),
+                    "pident": pident
                     }
             
             if if_loci:
                 if itf.remove_by_regex(query, pattern) == itf.remove_by_regex(subject, pattern):
                      # Largest self-score is choosen
-                    if float(pident) == 100 and get_self_score and int(score) > self_score:
-                        self_score = int(score)
+                    if pident == 100 and get_self_score and score > self_score:
+                        self_score = score
                     continue
             # Skip if entry matched itself and get self-score if needed
             elif query == subject:
                 # Largest self-score is choosen
-                if float(pident) == 100 and get_self_score and int(score) > self_score:
-                    self_score = int(score)
+                if pident == 100 and get_self_score and score > self_score:
+                    self_score = score
                 continue
             
             if skip_reverse_alignemnts:
-                if int(query_start) > int(query_end) or int(subject_start) > int(subject_end):
+                if query_start > query_end or subject_start > subject_end:
                     continue
 
-            if not query in alignments_dict.keys():
+            if query not in alignments_dict:
                 alignments_dict[query] = {}
                 if get_coords:
                     alignment_coords_all[query] = {}
                     alignment_coords_pident[query] = {}
-            if not subject in alignments_dict[query].keys():
+            query_alignments = alignments_dict[query]
+            if subject not in query_alignments:
                 # Create and save the first entry of BLAST
-                alignments_dict[query][subject] = {i: value}
+                query_alignments[subject] = {1: value}
                 if get_coords:
-                    alignment_coords_all[query][subject] = {}
-                    alignment_coords_pident[query][subject] = {}
-                    
-                    alignment_coords_all[query][subject] = {'query': [[int(query_start),int(query_end)]], 
-                                                            'subject': [[int(subject_start),int(subject_end)]],}
+                    alignment_coords_all[query][subject] = {'query': [[query_start, query_end]], 
+                                                            'subject': [[subject_start, subject_end]],}
                     # palign by pident
-                    if float(pident) >= pident_threshold:
-                        alignment_coords_pident[query][subject] = {'query': [[int(query_start),int(query_end)]],
-                                                                   'subject': [[int(subject_start),int(subject_end)]],}
+                    if pident >= pident_threshold:
+                        alignment_coords_pident[query][subject] = {'query': [[query_start, query_end]],
+                                                                   'subject': [[subject_start, subject_end]],}
                     # To still create the dict entries for further values
                     else:
                         alignment_coords_pident[query][subject] = {'query': [],
                                                                    'subject': [],}
             else:
                 # Save the other entries based on total number of entries present
-                # to get the ID
-                k = max(alignments_dict[query][subject].keys()) + 1
-                alignments_dict[query][subject].update({k: value})
+                # to get the ID, entries are numbered from 1 without gaps
+                subject_alignments = query_alignments[subject]
+                subject_alignments[len(subject_alignments) + 1] = value
                 if get_coords:
-                    alignment_coords_all[query][subject]['query'].append([int(query_start),int(query_end)])
-                    alignment_coords_all[query][subject]['subject'].append([int(subject_start),int(subject_end)])
+                    alignment_coords_all[query][subject]['query'].append([query_start, query_end])
+                    alignment_coords_all[query][subject]['subject'].append([subject_start, subject_end])
                     # palign by pident
-                    if float(pident) >= pident_threshold:
-                        alignment_coords_pident[query][subject]['query'].append([int(query_start),int(query_end)])
-                        alignment_coords_pident[query][subject]['subject'].append([int(subject_start),int(subject_end)])
+                    if pident >= pident_threshold:
+                        alignment_coords_pident[query][subject]['query'].append([query_start, query_end])
+                        alignment_coords_pident[query][subject]['subject'].append([subject_start, subject_end])
             
     return alignments_dict, self_score, alignment_coords_all, alignment_coords_pident
 
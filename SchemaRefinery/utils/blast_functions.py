@@ -1,5 +1,9 @@
 import subprocess
 import os
+import sys
+import re
+import hashlib
+from functools import lru_cache
 
 def make_blast_db(makeblastdb_exec ,input_fasta, output_path, db_type):
     """
@@ -17,8 +21,10 @@ def make_blast_db(makeblastdb_exec ,input_fasta, output_path, db_type):
 
     Returns
     -------
-    return : None
-        Creates blast database
+    returncode : int
+        Exit status of makeblastdb, 0 if the database was created.
+    stderr : bytes
+        Warnings/errors reported by makeblastdb.
     """
 
     blastdb_cmd = [makeblastdb_exec, '-in', input_fasta, '-out', output_path,
@@ -32,6 +38,89 @@ def make_blast_db(makeblastdb_exec ,input_fasta, output_path, db_type):
 
     makedb_cmd.wait()
 
+    return [makedb_cmd.returncode, stderr]
+
+def make_blast_db_if_changed(makeblastdb_exec, input_fasta, output_path, db_type):
+    """
+    Create a BLAST database only if it does not exist or if it was
+    built from a Fasta file with a different content. The SHA-256 digest
+    of the Fasta file is stored next to the database, so that a database
+    is reused when a pipeline is run again and writes the same Fasta file.
+
+    Parameters
+    ----------
+    makeblastdb_exec : str
+        Path to the makeblastdb executable.
+    input_fasta : str
+        Path to a Fasta file.
+    output_path : str
+        Path to the output BLAST database.
+    db_type : str
+        Type of the database, nucleotide (nucl) or
+        protein (prot).
+
+    Returns
+    -------
+    created : bool
+        True if the database was created, False if it was reused.
+    """
+    digest = hashlib.sha256()
+    with open(input_fasta, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(chunk)
+    fasta_hash = digest.hexdigest()
+
+    hash_file = output_path + '.fasta_hash'
+    prefix = 'p' if db_type == 'prot' else 'n'
+    db_exists = any(os.path.isfile(output_path + extension)
+                    for extension in (f'.{prefix}in', f'.{prefix}al'))
+    if db_exists and os.path.isfile(hash_file):
+        with open(hash_file) as infile:
+            if infile.read().strip() == fasta_hash:
+                return False
+
+    # The digest is removed first and only written again if makeblastdb
+    # succeeds, so that a partial database is never reused.
+    if os.path.isfile(hash_file):
+        os.remove(hash_file)
+    returncode, stderr = make_blast_db(makeblastdb_exec, input_fasta, output_path, db_type)
+    if returncode != 0:
+        sys.exit(f"\nError: makeblastdb failed to create {output_path}:\n"
+                 f"{stderr.decode(errors='replace').strip()}")
+    with open(hash_file, 'w') as outfile:
+        outfile.write(fasta_hash)
+
+    return True
+
+@lru_cache(maxsize=None)
+def blast_supports_mt_mode(blast_exec):
+    """
+    Check if a BLAST executable supports splitting the threads by query
+    (-mt_mode 1), available since BLAST 2.12. The version is only checked
+    once for each executable.
+
+    Parameters
+    ----------
+    blast_exec : str
+        Path to the BLAST executable.
+
+    Returns
+    -------
+    supports_mt_mode : bool
+        True if the BLAST version is 2.12 or greater, False otherwise.
+    """
+    try:
+        version_cmd = subprocess.run([blast_exec, '-version'],
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE)
+    except OSError:
+        return False
+
+    version = re.search(rb'(\d+)\.(\d+)\.\d+', version_cmd.stdout)
+    if version is None:
+        return False
+
+    return (int(version.group(1)), int(version.group(2))) >= (2, 12)
 
 def run_blast(blast_path, blast_db, fasta_file, blast_output,
               max_hsps=1, threads=1, ids_file=None, blast_task=None,
@@ -172,7 +261,8 @@ def run_blastdb_multiprocessing(blast_exec, blast_db, fasta_file, id_, blast_out
     max_hsps : int, optional
         Maximum number of High-Scoring Pairs.
     threads : int, optional
-        Number of threads passed to BLAST.
+        Number of threads passed to BLAST. With more than one thread
+        and BLAST 2.12 or greater, the threads are split by query.
     ids_file : path, optional
         Path to a file with the identifiers of the sequences
         to align against. Used to specify the database sequences
@@ -202,6 +292,9 @@ def run_blastdb_multiprocessing(blast_exec, blast_db, fasta_file, id_, blast_out
         blast_args.extend(['-task', blast_task])
     if max_targets is not None:
         blast_args.extend(['-max_target_seqs', str(max_targets)])
+    # Split the threads by query instead of by database volume.
+    if threads > 1 and blast_supports_mt_mode(blast_exec):
+        blast_args.extend(['-mt_mode', '1'])
 
     run_blast_with_args_only(blast_args)
 
@@ -1,5 +1,4 @@
 import networkx as nx
-from collections import Counter
 
 try:
     from utils import (kmers_functions as kf,
@@ -51,13 +50,13 @@ def select_representatives(kmers, reps_groups, clustering_sim, clustering_cov,
         for value in v:
             all_rep_pos.setdefault(value, []).append(k)
 
-    # count number of kmer hits per representative
-    counts = Counter(itf.flatten_list(current_reps.values()))
-    
+    # the number of kmer hits per representative is the number of positions
+    # stored for it, no need to count them again
+    total_kmers = len(kmers)
     #selects reps_loci based on number of kmer hits/total number of kmers
-    selected_reps = [(k, v/len(kmers))
-                     for k, v in counts.items()
-                     if v/len(kmers) >= clustering_sim]
+    selected_reps = [(k, len(v)/total_kmers)
+                     for k, v in all_rep_pos.items()
+                     if len(v)/total_kmers >= clustering_sim]
             
     # sort by identifier and then by similarity to always get same order
     selected_reps = sorted(selected_reps, key=lambda x: x[0])
@@ -237,7 +236,7 @@ def cluster_based_on_ids(processed_representatives_dict):
 
     for key in processed_representatives_dict.keys():
 
-        pairs_list.add(tuple([locus.split("_")[0] for locus in key.split(";")]))
+        pairs_list.add(tuple([locus.partition("_")[0] for locus in key.split(";")]))
 
     G = nx.Graph()
     G.add_edges_from(pairs_list)
@@ -1,4 +1,7 @@
 import os
+import io
+import sys
+import itertools
 import concurrent.futures
 from itertools import repeat
 
@@ -235,9 +238,7 @@ def add_items_to_results(representative_blast_results, reps_kmers_sim, bsr_value
         - This function is essential for workflows involving comparative genomics or sequence alignment analysis, where BSR values provide a standardized measure of sequence similarity.
         """
         bsr = bsr_values[query].get(subject, 0)
-        if bsr > 1.0:
-            bsr = float(round(bsr))
-        return round(bsr, 4)
+        return float(round(bsr)) if bsr > 1.0 else round(bsr, 4)
 
     def calculate_total_length(representative_blast_results_coords, query, subject):
         """
@@ -963,7 +964,7 @@ def extract_results(processed_results, count_results_by_class, frequency_in_geno
         all_relationships.setdefault(v[0], []).append(v[1])
 
     sort_order = ['Joined', 'Choice', 'Keep', 'Drop']
-    recommendations = {k: {l[0]: l[1] for l in sorted(v.items(), key=lambda x: sort_order.index(x[0].split('_')[0]))} for k, v in recommendations.items()}
+    recommendations = {k: {l[0]: l[1] for l in sorted(v.items(), key=lambda x: sort_order.index(x[0].partition('_')[0]))} for k, v in recommendations.items()}
     
     return all_relationships, related_clusters, recommendations
 
@@ -1007,15 +1008,17 @@ def write_blast_summary_results(related_clusters, count_results_by_class, reps_a
       A blank line is added after each cluster's information.
     """
     related_matches = os.path.join(results_output, "related_matches.tsv")
-    reported_cases = {}
+    # Pairs already reported, kept in a set instead of flattening a dict
+    # of lists for every membership test.
+    reported_cases = set()
     for key, related in list(related_clusters.items()):
         for index, r in enumerate(list(related)):
             if reverse_matches:
                 r.insert(4, '-')
                 r.insert(5, '-')
             [query, subject] = [itf.remove_by_regex(i, r"\*") for i in r[:2]]
-            if (query, subject) not in itf.flatten_list(reported_cases.values()):
-                reported_cases.setdefault(key, []).append((subject, query))
+            if (query, subject) not in reported_cases:
+                reported_cases.add((subject, query))
             elif reverse_matches:
                 sublist_index = itf.find_sublist_index([[itf.remove_by_regex(i, r"\*") for i in l[:2]] for l in related_clusters[key]], [subject, query])
                 insert = r[2] if not None else '-'
@@ -1046,7 +1049,7 @@ def write_blast_summary_results(related_clusters, count_results_by_class, reps_a
         for id_, classes in count_results_by_class.items():
             count_results_by_cluster_file.write('\t'.join(id_.split('|')))
             total_count = sum(classes.values())
-            query = itf.try_convert_to_type(id_.split('|')[0], int)
+            query = itf.try_convert_to_type(id_.partition('|')[0], int)
             subject = itf.try_convert_to_type(id_.split('|')[1], int)
             for i, items in enumerate(classes.items()):
                 if i == 0:
@@ -1101,8 +1104,8 @@ def get_loci_matches(all_relationships, if_only_loci, cds_to_keep, schema_loci_s
     Notes
     -----
     - The function first checks if `loci_ids` is provided to determine the mode of operation.
-    - It uses utility functions like `itf.flatten_list` to simplify the structure of `all_relationships`
-    and `itf.remove_by_regex` to clean up the IDs for matching.
+    - The relationships in `all_relationships` are indexed once by subject, and `itf.remove_by_regex`
+    is used to clean up the IDs for matching.
     - The matching process accounts for whether entries are part of a joined cluster and adjusts the
     matching logic accordingly.
     - The function returns two dictionaries: one for general matches and one specifically for alleles,
@@ -1110,8 +1113,13 @@ def get_loci_matches(all_relationships, if_only_loci, cds_to_keep, schema_loci_s
     """
     is_matched = {}
     is_matched_alleles = None if not if_only_loci else {}
+    relationships = itertools.chain.from_iterable(all_relationships.values())
     if not if_only_loci:
-        relationships = itf.flatten_list(all_relationships.values())
+        # Index the matched loci by subject once, instead of scanning all
+        # of the relationships for each entry.
+        matched_by_subject = {}
+        for r in relationships:
+            matched_by_subject.setdefault(r[1], set()).add(itf.remove_by_regex(r[0], '_(\d+)'))
         for class_, entries in list(cds_to_keep.items()):
             for entry in list(entries):
                 if entry not in schema_loci_short:
@@ -1120,22 +1128,21 @@ def get_loci_matches(all_relationships, if_only_loci, cds_to_keep, schema_loci_s
                         entry = cds_joined_cluster[entry]
                     else:
                         entry = [entry]
-                    is_matched.setdefault(id_, set([itf.remove_by_regex(i[0], '_(\d+)') for i in relationships if i[1] in entry]))
+                    is_matched.setdefault(id_, set().union(*[matched_by_subject.get(e, ())
+                                                             for e in entry]))
     else:
-        relationships = itf.flatten_list(all_relationships.values())
-        changed_ids = [[r[0], itf.remove_by_regex(r[1], '_(\d+)')] for r in relationships]
+        # Index the (query, subject allele) pairs by subject locus once.
+        matched_by_locus = {}
+        for r in relationships:
+            matched_by_locus.setdefault(itf.remove_by_regex(r[1], '_(\d+)'), []).append(r)
         had_matches = set([itf.remove_by_regex(rep, '_(\d+)') for rep in sorted_blast_dict])
         is_matched_alleles = {}
         for class_, entries in list(cds_to_keep.items()):
             for entry in list(entries):
                 if entry not in had_matches and not class_ == '1a':
-                    id_ = entry
-                    entry = [entry]
-                    is_matched.setdefault(id_, set([i[0] for i in changed_ids if i[1] in entry]))
-                    is_matched_alleles.setdefault(id_, set([i[1] 
-                                                            for i in relationships 
-                                                            if i[0] in is_matched[id_] 
-                                                            and itf.remove_by_regex(i[1], '_(\d+)') in entry]))
+                    matches = matched_by_locus.get(entry, [])
+                    is_matched.setdefault(entry, set([r[0] for r in matches]))
+                    is_matched_alleles.setdefault(entry, set([r[1] for r in matches]))
     return is_matched, is_matched_alleles
 
 def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path, 
@@ -1294,7 +1301,7 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
             origin_path = groups_paths_old.pop(cds) if case_id == 0 else loci[cds]
             ff.copy_file(origin_path, file_path)
 
-    def write_fasta_to_keep(class_, cds_list, cds_outcome_results_fastas_folder, cds_outcome_results_reps_fastas_folder, fasta_folder, groups_paths, groups_paths_reps, not_included_cds, clusters):
+    def write_fasta_to_keep(class_, cds_list, cds_outcome_results_fastas_folder, cds_outcome_results_reps_fastas_folder, master_handle, master_rep_handle, groups_paths, groups_paths_reps, not_included_cds, clusters):
         """
         Process each class and CDS list in cds_to_keep.
 
@@ -1308,8 +1315,10 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
             The path to the results folder.
         cds_outcome_results_reps_fastas_folder : str
             The path to the folder where the representative results will be stored.
-        fasta_folder : str
-            The path to the folder where the fasta files are stored.
+        master_handle : file object
+            Open master file where all of the alleles are also written.
+        master_rep_handle : file object
+            Open master file where the representatives are also written.
         groups_paths : dict
             The dictionary containing the paths to the groups.
         groups_paths_reps : dict
@@ -1334,8 +1343,6 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
             
             cds_group_fasta_file = os.path.join(cds_outcome_results_fastas_folder, class_name_cds + '.fasta')    
             cds_group_reps_file = os.path.join(cds_outcome_results_reps_fastas_folder, class_name_cds + '.fasta')
-            master_file = os.path.join(fasta_folder, 'master_file.fasta')
-            master_file_rep = os.path.join(fasta_folder, 'master_rep_file.fasta')
             groups_paths[main_rep] = cds_group_fasta_file
             groups_paths_reps[main_rep] = cds_group_reps_file
             if isinstance(cds,str):
@@ -1343,34 +1350,23 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
             else:
                 cds = cds_to_keep[class_][cds]
             index = 1
-            # Write all of the alleles to the files.
+            # Write all of the alleles to the group file and to the master file.
             with open(cds_group_fasta_file, 'w') as fasta_file:
                 for rep_id in cds:
                     cds_ids = [cds_id for cds_id in clusters[rep_id]]
                     for cds_id in cds_ids:
-                        fasta_file.write(f">{main_rep}_{index}\n{str(not_included_cds[cds_id])}\n")
+                        record = f">{main_rep}_{index}\n{str(not_included_cds[cds_id])}\n"
+                        fasta_file.write(record)
+                        master_handle.write(record)
                         alleles.setdefault(main_rep, []).append(f"{main_rep}_{index}")
                         index += 1
             index = 1
-            # Write all of the alleles to the master file.
-            write_type = 'a' if os.path.exists(master_file) else 'w'
-            with open(master_file, write_type) as fasta_file:
-                for rep_id in cds:
-                    cds_ids = [cds_id for cds_id in clusters[rep_id]]
-                    for cds_id in cds_ids:
-                        fasta_file.write(f">{main_rep}_{index}\n{str(not_included_cds[cds_id])}\n")
-                        index += 1
-            index = 1
             # Write only the representative to the files.
             with open(cds_group_reps_file, 'w') as fasta_file:
                 for rep_id in cds:
-                    fasta_file.write(f">{main_rep}_{index}\n{str(not_included_cds[rep_id])}\n")
-                    index += 1
-            index = 1
-            # Write the representative to the master file.
-            with open(master_file_rep, write_type) as fasta_file:
-                for rep_id in cds:
-                    fasta_file.write(f">{main_rep}_{index}\n{str(not_included_cds[rep_id])}\n")
+                    record = f">{main_rep}_{index}\n{str(not_included_cds[rep_id])}\n"
+                    fasta_file.write(record)
+                    master_rep_handle.write(record)
                     index += 1
 
     def translate_possible_new_loci(fasta_folder, groups_paths, groups_paths_reps, constants):
@@ -1393,41 +1389,34 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
         trans_dict_cds : dict
             The dictionary containing the translated sequences.
         """
-        groups_trans_folder = os.path.join(fasta_folder, 'cds_groups_translation')
-        ff.create_directory(groups_trans_folder)
-        groups_trans = {}
+        # All groups are translated into a single FASTA file
+        groups_trans_file = os.path.join(fasta_folder, 'cds_groups_translation.fasta')
         trans_dict_cds = {}
-        for key, group_path in groups_paths.items():
-            trans_path = os.path.join(groups_trans_folder, os.path.basename(group_path))
-            groups_trans[key] = trans_path
-            fasta_dict = sf.fetch_fasta_dict(group_path, False)
-            trans_dict, _, _ = sf.translate_seq_deduplicate(fasta_dict,
-                                                            trans_path,
-                                                            None,
-                                                            constants[5],
-                                                            False,
-                                                            constants[6],
-                                                            False)
-            for id_, sequence in trans_dict.items():
-                trans_dict_cds[id_] = sequence
-        
-        group_trans_rep_folder = os.path.join(fasta_folder, 'cds_groups_translation_reps')
-        ff.create_directory(group_trans_rep_folder)
-        groups_trans_reps_paths = {}
+        with open(groups_trans_file, 'w', buffering=1 << 20) as groups_trans:
+            for group_path in groups_paths.values():
+                fasta_dict = sf.fetch_fasta_dict(group_path, False)
+                trans_dict, _, _ = sf.translate_seq_deduplicate(fasta_dict,
+                                                                groups_trans,
+                                                                None,
+                                                                constants[5],
+                                                                False,
+                                                                constants[6],
+                                                                False)
+                trans_dict_cds.update(trans_dict)
+
+        groups_trans_reps_file = os.path.join(fasta_folder, 'cds_groups_translation_reps.fasta')
         reps_trans_dict_cds = {}
-        for key, group_path in groups_paths_reps.items():
-            trans_path = os.path.join(group_trans_rep_folder, os.path.basename(group_path))
-            groups_trans_reps_paths[key] = trans_path
-            fasta_dict = sf.fetch_fasta_dict(group_path, False)
-            trans_dict, _, _ = sf.translate_seq_deduplicate(fasta_dict,
-                                                            trans_path,
-                                                            None,
-                                                            constants[5],
-                                                            False,
-                                                            constants[6],
-                                                            False)
-            for id_, sequence in trans_dict.items():
-                reps_trans_dict_cds[id_] = sequence
+        with open(groups_trans_reps_file, 'w', buffering=1 << 20) as groups_trans_reps:
+            for group_path in groups_paths_reps.values():
+                fasta_dict = sf.fetch_fasta_dict(group_path, False)
+                trans_dict, _, _ = sf.translate_seq_deduplicate(fasta_dict,
+                                                                groups_trans_reps,
+                                                                None,
+                                                                constants[5],
+                                                                False,
+                                                                constants[6],
+                                                                False)
+                reps_trans_dict_cds.update(trans_dict)
 
         return trans_dict_cds
 
@@ -1528,8 +1517,8 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
                                                in printout.items()
                                                if class_ != '1a'])) + len(itf.flatten_list(cds_to_keep['1a'].values()))
 
-            print(f"Out of {len(groups_paths_old) if i==0 else len(loci)} {'CDSs groups' if i == 0 else 'loci'}:")
-            print(f"\t{total_loci} {'CDSs' if i == 0 else 'loci'}"
+            print(f"Out of {len(groups_paths_old) if i==0 else len(loci)} {'CDSs groups' if i == 0 else 'loci'}:\n"
+                f"\t{total_loci} {'CDSs' if i == 0 else 'loci'}"
                 f" representatives had matches with BLASTn against the {'CDSs' if i == 0 else 'schema'}.")
 
             # Print the classification results
@@ -1541,8 +1530,8 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
                     " didn't have any BLASTn matches so they were retained.\n")
     else:
         # Write info about the classification results.
-        print(f"Out of {len(clusters)} clusters:")
-        print(f"\t{sum(count_cases.values()) + len(drop_set)} CDS representatives had matches with BLASTn"
+        print(f"Out of {len(clusters)} clusters:\n"
+            f"\t{sum(count_cases.values()) + len(drop_set)} CDS representatives had matches with BLASTn"
             f" which resulted in {len(itf.flatten_list(cds_to_keep.values()))} groups")
 
         # Print the classification results
@@ -1586,9 +1575,15 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
     else:
         print("Writing FASTA and additional files for possible new loci...")
 
-        # Process each class and CDS list in cds_to_keep
-        for class_, cds_list in cds_to_keep.items():
-            write_fasta_to_keep(class_, cds_list, cds_outcome_results_fastas_folder, cds_outcome_results_reps_fastas_folder, fasta_folder, groups_paths, groups_paths_reps, not_included_cds, clusters)
+        master_file = os.path.join(fasta_folder, 'master_file.fasta')
+        master_file_rep = os.path.join(fasta_folder, 'master_rep_file.fasta')
+        # Open the master files once, the records of every group are written
+        # to them as the group files are written.
+        with open(master_file, 'w', buffering=1 << 20) as master_handle, \
+             open(master_file_rep, 'w', buffering=1 << 20) as master_rep_handle:
+            # Process each class and CDS list in cds_to_keep
+            for class_, cds_list in cds_to_keep.items():
+                write_fasta_to_keep(class_, cds_list, cds_outcome_results_fastas_folder, cds_outcome_results_reps_fastas_folder, master_handle, master_rep_handle, groups_paths, groups_paths_reps, not_included_cds, clusters)
 
         # Translate possible new loci and write to master file
         trans_dict_cds = translate_possible_new_loci(fasta_folder, groups_paths, groups_paths_reps, constants)
@@ -1596,8 +1591,6 @@ def wrap_up_blast_results(cds_to_keep, not_included_cds, clusters, output_path,
         # Write cluster members to file
         write_cluster_members_to_file(output_path, cds_to_keep, clusters, frequency_in_genomes)
 
-        master_file = os.path.join(fasta_folder, 'master_file.fasta')
-
     return groups_paths, trans_dict_cds, master_file, alleles
 
 def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
@@ -1661,13 +1654,25 @@ def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
     representative_blast_results_coords_pident = {}
     # Get Path to the blastn executable
     get_blastn_exec = lf.get_tool_path('blastn')
+    # Concatenate the query FASTA files into one batch per CPU, so that
+    # each BLASTn process loads the database once for all of its queries.
+    blastn_batches_folder = os.path.join(blastn_output, 'BLASTn_batches')
+    ff.create_directory(blastn_batches_folder)
+    query_paths = list(rep_paths_nuc.values())
+    total_batches = max(1, min(cpu, total_reps))
+    batch_paths = {}
+    for batch in range(1, total_batches + 1):
+        batch_path = os.path.join(blastn_batches_folder, f"blastn_batch_{batch}.fasta")
+        ff.concat_files_to_file(query_paths[batch - 1::total_batches], batch_path)
+        batch_paths[f"batch_{batch}"] = batch_path
+
     i = 1
     with concurrent.futures.ProcessPoolExecutor(max_workers=cpu) as executor:
         for res in executor.map(bf.run_blastdb_multiprocessing,
                                 repeat(get_blastn_exec),
                                 repeat(blast_db),
-                                rep_paths_nuc.values(),
-                                cds_to_blast,
+                                batch_paths.values(),
+                                batch_paths.keys(),
                                 repeat(blastn_results_folder)
                                 ):
 
@@ -1679,7 +1684,7 @@ def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
             representative_blast_results_coords_pident.update(alignment_coords_pident)
 
             print(
-                f"\rRunning BLASTn for cluster representatives: {res[0]} - {i}/{total_reps: <{max_id_length}}", 
+                f"\rRunning BLASTn for cluster representatives: {res[0]} - {i}/{total_batches: <{max_id_length}}", 
                 end='', flush=True)
             i += 1
 
@@ -1712,6 +1717,8 @@ def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
     # Write the protein FASTA files.
     rep_paths_prot = {}
     rep_matches_prot = {}
+    # File (self-score entry) to which each representative was written.
+    rep_query_files = {}
     if multi_fasta:
         blasts_to_run = {}
         seen_entries = {} 
@@ -1737,6 +1744,7 @@ def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
         write_type = 'a' if os.path.exists(rep_translation_file) else 'w'
         
         rep_paths_prot[filename] = rep_translation_file
+        rep_query_files[query_id] = filename
         with open(rep_translation_file, write_type) as trans_fasta_rep:
             trans_fasta_rep.writelines(">"+query_id+"\n")
             trans_fasta_rep.writelines(str(reps_translation_dict[query_id])+"\n")
@@ -1775,25 +1783,47 @@ def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
     self_score_dict = {}
     for query in rep_paths_prot:
         # For self-score
-        self_score_dict[query] = {}
+        self_score_dict[query] = 0
     # Get Path to the blastp executable
     get_blastp_exec = lf.get_tool_path('blastp')
-    i = 1
-    # Calculate self-score
-    with concurrent.futures.ProcessPoolExecutor(max_workers=cpu) as executor:
-        for res in executor.map(bf.run_self_score_multiprocessing,
-                                rep_paths_prot.keys(),
-                                repeat(get_blastp_exec),
-                                rep_paths_prot.values(),
-                                repeat(blastp_results_ss_folder)):
-            
-            _, self_score, _, _ = af.get_alignments_dict_from_blast_results(res[1], 0, True, True, True, if_loci)
-    
-            # Save self-score
-            self_score_dict[res[0]] = self_score
-                            
-            print(f"\rRunning BLASTp to calculate self-score for {res[0]: <{max_id_length}}", end='', flush=True)
-            i += 1
+    # Calculate self-score, all of the representatives are aligned against
+    # each other in a single BLASTp instead of one BLASTp per file.
+    all_reps_prot_file = os.path.join(blastp_results_ss_folder, 'all_reps_translations.fasta')
+    ff.concat_files_to_file(rep_paths_prot.values(), all_reps_prot_file)
+    if rep_paths_prot:
+        self_score_db = os.path.join(blastp_results_ss_folder, 'self_score_db', 'self_score_db')
+        ff.create_directory(os.path.dirname(self_score_db))
+        returncode, stderr = bf.make_blast_db(lf.get_tool_path('makeblastdb'),
+                                              all_reps_prot_file, self_score_db, 'prot')
+        # Without the database all self-scores would stay 0 and the BSR
+        # could not be computed.
+        if returncode != 0:
+            sys.exit(f"\nError: makeblastdb failed to create {self_score_db}:\n"
+                     f"{stderr.decode(errors='replace').strip()}")
+        # The best hit of each representative is the alignment against itself.
+        _, self_score_results = bf.run_blastdb_multiprocessing(get_blastp_exec,
+                                                               self_score_db,
+                                                               all_reps_prot_file,
+                                                               'self_score',
+                                                               blastp_results_ss_folder,
+                                                               max_hsps=1,
+                                                               threads=cpu,
+                                                               max_targets=1)
+        pattern = r'_(\d+)'
+        with open(self_score_results, 'r') as self_score_file:
+            for line in self_score_file:
+                cols = line.rstrip('\n').split('\t')
+                query, subject = cols[0], cols[1]
+                # Self-alignments (or alignments between alleles of the same locus).
+                if if_loci:
+                    is_self = itf.remove_by_regex(query, pattern) == itf.remove_by_regex(subject, pattern)
+                else:
+                    is_self = query == subject
+                if is_self and float(cols[11]) == 100:
+                    # Largest self-score is choosen
+                    filename = rep_query_files[query]
+                    if int(cols[9]) > self_score_dict[filename]:
+                        self_score_dict[filename] = int(cols[9])
     # Print newline
     print('\n')  
     
@@ -1821,18 +1851,18 @@ def run_blasts(blast_db, cds_to_blast, reps_translation_dict,
                 if len(blastn_entries) != len(blastp_entries):
                     none_blastp[res[0]] = list(set(blastn_entries).symmetric_difference(set(blastp_entries)))
 
+            # Self-score is the same for all of the matches of this run.
+            self_score = self_score_dict[res[0]]
             # Since BLAST may find several local aligments choose the largest one to calculate BSR.
             for query, subjects_dict in filtered_alignments_dict.items():
+                query_bsr_values = bsr_values.setdefault(query, {})
                 for subject_id, results in subjects_dict.items():
-                    largest_score = 0
                     # Score is the largest one between query-subject alignment.
                     # We want the largest score since there may be various matches
                     # alignments, we are interested in knowing overall BSR score
                     # between matches and not for the local alignment.
-                    for entry_id, result in results.items():
-                        if result['score'] > largest_score:
-                            largest_score = self_score_dict[res[0]]
-                            bsr_values[query].update({subject_id: bf.compute_bsr(result['score'], self_score_dict[res[0]])})
+                    largest_score = max(result['score'] for result in results.values())
+                    query_bsr_values[subject_id] = bf.compute_bsr(largest_score, self_score)
         
             print(f"\rRunning BLASTp for cluster representatives matches: {res[0]} - {i}/{total_blasts: <{max_id_length}}", end='', flush=True)
             i += 1
@@ -2219,6 +2249,69 @@ def extract_cds_to_keep(classes_outcome, count_results_by_class, drop_mark):
 
     return cds_to_keep, drop_set
 
+def translate_loci_file(loci_path, translate_path, translated_ids, min_len, translation_table):
+    """
+    Reads and translates the alleles of a locus FASTA file, used to translate
+    the loci of a schema in parallel.
+
+    Parameters
+    ----------
+    loci_path : str
+        Path to the locus FASTA file with all of the alleles.
+    translate_path : str
+        Path to the FASTA file to translate, the locus file itself or the
+        file with its representatives.
+    translated_ids : set
+        IDs of the alleles that already have a translation, these are not
+        translated again.
+    min_len : int
+        Minimum length for the sequences.
+    translation_table : int
+        Translation table to use.
+
+    Returns
+    -------
+    allele_ids : list
+        The IDs of all of the alleles of the locus.
+    translation_dict : dict
+        Dict that contains the allele ID as key and the protein as value.
+    translations : str
+        The translations formatted as FASTA records.
+    skipped_ids : list
+        The IDs of the alleles in translated_ids that were not translated
+        again.
+    """
+    with open(translate_path, 'rb') as loci_file:
+        loci_data = loci_file.read()
+    fasta_dict = {allele_id: sequence.decode()
+                  for allele_id, sequence in sf.read_fasta_buffer(loci_data)}
+    # Only the headers of the locus file are needed if its representatives
+    # are the ones translated.
+    allele_ids = list(fasta_dict) if translate_path == loci_path else sf.fetch_fasta_ids(loci_path)
+    skipped_ids = []
+    if translated_ids:
+        skipped_ids = [allele_id for allele_id in fasta_dict
+                       if allele_id in translated_ids]
+        fasta_dict = {allele_id: sequence
+                      for allele_id, sequence in fasta_dict.items()
+                      if allele_id not in translated_ids}
+    # The translations are returned to be written by the parent process.
+    translations = io.StringIO()
+    translation_dict = {}
+    if fasta_dict:
+        translation_dict, _, _ = sf.translate_seq_deduplicate(fasta_dict,
+                                                              translations,
+                                                              None,
+                                                              min_len,
+                                                              False,
+                                                              translation_table,
+                                                              False)
+
+    return [allele_ids,
+            translation_dict,
+            translations.getvalue(),
+            skipped_ids]
+
 def process_schema(schema, groups_paths, results_output, reps_trans_dict_cds, 
                    alleles, frequency_in_genomes, allelecall_directory, 
                    master_file, loci_ids, if_only_loci, master_alleles, constants, cpu):
@@ -2270,22 +2363,21 @@ def process_schema(schema, groups_paths, results_output, reps_trans_dict_cds,
     blastn_output = os.path.join(blast_results, '1_BLASTn_processing')
     ff.create_directory(blastn_output)
 
-    # Get all of the schema loci short FASTA files path.
+    # Get all of the schema loci FASTA files path with a single directory scan.
+    schema_loci = {}
+    with os.scandir(schema) as schema_entries:
+        for entry in schema_entries:
+            if entry.name.endswith('.fasta') and entry.is_file():
+                schema_loci[entry.name.replace(".fasta", "")] = entry.path
+    # The short FASTA files paths of the loci are derived from their names.
     schema_short_path = os.path.join(schema, 'short')
-    schema_loci_short = {loci_path.replace("_short.fasta", ""): os.path.join(schema_short_path, loci_path) 
-                         for loci_path in os.listdir(schema_short_path) 
-                         if loci_path.endswith('.fasta')}
-    
-    # Get all of the schema loci FASTA files path.
-    schema_loci = {loci_path.replace(".fasta", ""): os.path.join(schema, loci_path) 
-                         for loci_path in os.listdir(schema) 
-                         if loci_path.endswith('.fasta')}
+    schema_loci_short = {loci: os.path.join(schema_short_path, f"{loci}_short.fasta")
+                         for loci in schema_loci}
 
-    # Create a folder for short translations.
+    # Create a folder for the loci translations.
     blastp_output =  os.path.join(blast_results, '2_BLASTp_processing')
     ff.create_directory(blastp_output)
-    short_translation_folder = os.path.join(blastp_output, 'short_translation_folder')
-    ff.create_directory(short_translation_folder)
+    loci_translation_file = os.path.join(blastp_output, 'loci_translations.fasta')
 
     # Find the file in the allele call results that contains the total of each.
     # classification obtained for each loci.
@@ -2293,8 +2385,9 @@ def process_schema(schema, groups_paths, results_output, reps_trans_dict_cds,
     # Convert TSV table to dict.
     results_statistics_dict = itf.tsv_to_dict(results_statistics)
     # Add the results for all of the Exact matches to the frequency_in_genomes dict.
-    for key, value in results_statistics_dict.items():
-        frequency_in_genomes.setdefault(key, int(value[0]))
+    frequency_in_genomes.update({key: int(value[0])
+                                 for key, value in results_statistics_dict.items()
+                                 if key not in frequency_in_genomes})
     # Translate each short loci and write to master fasta.
     i = 1
     len_short_folder = len(schema_loci_short)
@@ -2310,30 +2403,60 @@ def process_schema(schema, groups_paths, results_output, reps_trans_dict_cds,
     # Create varible to store proteins sequences if it doesn't exist.
     reps_trans_dict_cds = {} if not reps_trans_dict_cds else reps_trans_dict_cds
     # If to BLAST against reps or all of the alleles.
-    schema_loci if master_alleles else schema_loci_short
-    for loci, loci_short_path in schema_loci.items():
-        print(f"\rTranslated{'' if master_alleles else ' short'} loci FASTA: {i}/{len_short_folder}", end='', flush=True)
-        i += 1
-        fasta_dict = sf.fetch_fasta_dict(loci_short_path, False)
-        
-        for allele_id, sequence in fasta_dict.items():
-            all_alleles.setdefault(loci, []).append(allele_id)
+    loci_to_translate = schema_loci if master_alleles else schema_loci_short
+    # The loci FASTA files are copied to the master file by this process, in
+    # the loci order, so that the master file is the same in every run.
+    if write_to_master:
+        master_handle = open(master_file, 'wb')
+    # All loci translations are streamed to a single FASTA file, through a
+    # large buffer so that the records of many loci are written at once.
+    translation_handle = open(loci_translation_file, 'w', buffering=1 << 20)
+    # Alleles of the loci that already have a translation are not translated again.
+    translated_ids = {}
+    for allele_id in reps_trans_dict_cds:
+        loci = allele_id.rpartition('_')[0]
+        if loci in schema_loci:
+            translated_ids.setdefault(loci, set()).add(allele_id)
+    # Loci are read and translated in parallel, the results are written in
+    # the loci order by this process.
+    chunksize = max(1, len(schema_loci) // (cpu * 4))
+    progress_step = max(1, len_short_folder // 200)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=cpu) as executor:
+        for loci, [allele_ids, translation_dict,
+                   translations, skipped_ids] in zip(schema_loci,
+                                                     executor.map(translate_loci_file,
+                                                                  schema_loci.values(),
+                                                                  loci_to_translate.values(),
+                                                                  (translated_ids.get(loci) for loci in schema_loci),
+                                                                  repeat(constants[5]),
+                                                                  repeat(constants[6]),
+                                                                  chunksize=chunksize)):
+            # Progress is only printed every progress_step loci and for the last one.
+            if i % progress_step == 0 or i == len_short_folder:
+                print(f"\rTranslated{'' if master_alleles else ' short'} loci FASTA: {i}/{len_short_folder}", end='', flush=True)
+            i += 1
+            
+            all_alleles.setdefault(loci, []).extend(allele_ids)
 
             if write_to_master:
-                write_type = 'w' if not os.path.exists(master_file) else 'a'
-                with open(master_file, write_type) as master_file:
-                    master_file.write(f">{allele_id}\n{sequence}\n")
-
-        loci_short_translation_path = os.path.join(short_translation_folder, f"{loci}.fasta")
-        translation_dict, _, _ = sf.translate_seq_deduplicate(fasta_dict, 
-                                                              loci_short_translation_path,
-                                                              None,
-                                                              constants[5],
-                                                              False,
-                                                              constants[6],
-                                                              False)
-        for allele_id, sequence in translation_dict.items():
-            reps_trans_dict_cds[allele_id] = sequence
+                with open(loci_to_translate[loci], 'rb') as loci_file:
+                    ff.copy_file_contents(loci_file, master_handle)
+                    # Make sure the next locus starts in a new line.
+                    size = os.fstat(loci_file.fileno()).st_size
+                    if size and os.pread(loci_file.fileno(), 1, size - 1) != b'\n':
+                        master_handle.write(b'\n')
+
+            # Alleles that were not translated again are written with their
+            # existing translation, so that the file has all of the alleles.
+            for allele_id in skipped_ids:
+                translation_handle.write(f">{allele_id}\n{reps_trans_dict_cds[allele_id]}\n")
+            translation_handle.write(translations)
+            for allele_id, sequence in translation_dict.items():
+                reps_trans_dict_cds[allele_id] = sequence
+
+    translation_handle.close()
+    if write_to_master:
+        master_handle.close()
 
     # Create BLAST db for the schema DNA sequences.
     print(f"\nCreate BLAST db for the {'schema' if master_alleles else 'unclassified'} DNA sequences...")
@@ -2341,7 +2464,8 @@ def process_schema(schema, groups_paths, results_output, reps_trans_dict_cds,
     blast_db = os.path.join(blastn_output, 'blast_db_nucl')
     ff.create_directory(blast_db)
     blast_db_nuc = os.path.join(blast_db, 'Blast_db_nucleotide')
-    bf.make_blast_db(makeblastdb_exec, master_file, blast_db_nuc, 'nucl')
+    # The BLAST db of a previous run is reused if the master file did not change.
+    bf.make_blast_db_if_changed(makeblastdb_exec, master_file, blast_db_nuc, 'nucl')
 
     [representative_blast_results,
      representative_blast_results_coords_all,
@@ -2489,7 +2613,8 @@ def create_graphs(file_path, output_path, filename, other_plots = None):
 
     gf.save_plots_to_html([violinplot1, violinplot2] + extra_plot, results_output, filename)
 
-def classify_cds(schema, output_directory, allelecall_directory, constants, temp_paths, cpu):
+def classify_cds(schema, output_directory, allelecall_directory, constants, temp_paths, cpu,
+                 resume = False):
 
     temp_folder = temp_paths[0]
     file_path_cds = temp_paths[1]
@@ -2511,11 +2636,19 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
     decoded_sequences_ids = itf.decode_CDS_sequences_ids(cds_present)
 
     print("Identifying CDS not present in the schema...")
-    # Get dict with CDS ids as key and sequence as values.
-    not_included_cds = sf.fetch_fasta_dict(file_path_cds, True)
-    
-    for key, value in list(not_included_cds.items()):
-        not_included_cds[itf.replace_by_regex(key, '_', '-')] = not_included_cds.pop(key)
+    # Get dict with CDS ids as key and sequence as values. The FASTA file is
+    # streamed and each CDS is stored once, already with its final ID, while
+    # its size is counted.
+    not_included_cds = {}
+    cds_size = {}
+    i = 0
+    for i, (key, sequence) in enumerate(sf.read_fasta_file_bytes(file_path_cds), 1):
+        if i % sf.PROGRESS_STEP == 0:
+            print(f"\rProcessed {i} CDS", end='', flush=True)
+        key = key.replace('_', '-')
+        not_included_cds[key] = sequence.decode()
+        cds_size[key] = len(sequence)
+    print(f"\rProcessed {i} CDS", end='', flush=True)
 
     """
     print("Identifying CDS identified as missing classes...")
@@ -2530,23 +2663,10 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
     not_included_cds.update(missing_classes_fastas)
     """
     print("Filtering missing CDS in the schema...")
-    # Count CDS size
-    cds_size = {}
-    for key, sequence in not_included_cds.items():
-        key = itf.replace_by_regex(key, '_', '-')
-        cds_size.setdefault(key, len(str(sequence)))
-
     total_cds = len(not_included_cds)
     print(f"\nIdentified {total_cds} valid CDS not present in the schema.")
-    # Filter by size.
-    if constants[5]:
-        for key, values in list(not_included_cds.items()):
-            if len(values) < constants[5]:
-                del not_included_cds[key]
-        print(f"{len(not_included_cds)}/{total_cds} have size greater or equal to {constants[5]} bp.")
-    else:
+    if not constants[5]:
         constants[5] = 0
-        print("No size threshold was applied to the CDS filtering.")
 
     # Create directories.
     ff.create_directory(output_directory)
@@ -2556,35 +2676,47 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
     # This file contains unique CDS.
     cds_not_present_file_path = os.path.join(cds_output, 'CDS_not_found.fasta')
     
-    # Count the number of CDS present in the schema and write CDS sequence
-    # into a FASTA file.
+    # Filter by size, count the number of CDS present in the schema and write
+    # CDS sequence into a FASTA file in a single pass.
     frequency_cds = {}
-    with open(cds_not_present_file_path, 'w+') as cds_not_found:
-        for id_, sequence in not_included_cds.items():
-            cds_not_found.write(f">{id_}\n{str(sequence)}\n")
+    # Records are written as ASCII bytes to skip the text layer encoding.
+    with open(cds_not_present_file_path, 'wb', buffering=1 << 20) as cds_not_found:
+        for id_, sequence in list(not_included_cds.items()):
+            sequence = str(sequence)
+            if len(sequence) < constants[5]:
+                del not_included_cds[id_]
+                continue
+
+            cds_not_found.write(b">%b\n%b\n" % (id_.encode('ascii'),
+                                                 sequence.encode('ascii')))
             
-            hashed_seq = sf.seq_to_hash(str(sequence))
+            hashed_seq = sf.seq_to_hash(sequence)
             # if CDS sequence is present in the schema count the number of
             # genomes that it is found minus 1 (subtract the first CDS genome).
             if hashed_seq in decoded_sequences_ids:
                 frequency_cds[id_] = len(decoded_sequences_ids[hashed_seq]) - 1
             else:
                 frequency_cds[id_] = 0
-                
+
+    if constants[5]:
+        print(f"{len(not_included_cds)}/{total_cds} have size greater or equal to {constants[5]} bp.")
+    else:
+        print("No size threshold was applied to the CDS filtering.")
 
     print("\nTranslate and deduplicate CDS...")
-    # Translate the CDS and find unique proteins using hashes, the CDS with
-    # the same hash will be added under that hash in protein_hashes.
+    # Translate the CDS and find unique proteins using hashes, only the first
+    # CDS with each protein is kept.
     cds_not_present_trans_file_path = os.path.join(cds_output, "CDS_not_found_translation.fasta")
     cds_not_present_untrans_file_path = os.path.join(cds_output, "CDS_not_found_untranslated.fasta")
     # Translate and deduplicate protein sequences.
-    cds_translation_dict, protein_hashes, _ = sf.translate_seq_deduplicate(not_included_cds,
-                                                                           cds_not_present_trans_file_path,
-                                                                           cds_not_present_untrans_file_path,
-                                                                           constants[5],
-                                                                           True,
-                                                                           constants[6],
-                                                                           True)
+    cds_translation_dict, _, _ = sf.translate_seq_deduplicate(not_included_cds,
+                                                              cds_not_present_trans_file_path,
+                                                              cds_not_present_untrans_file_path,
+                                                              constants[5],
+                                                              True,
+                                                              constants[6],
+                                                              True,
+                                                              cpu)
     # Count translation sizes.
     cds_translation_size = {}
     for key, sequence in cds_translation_dict.items():
@@ -2603,82 +2735,63 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
     cds_translation_dict = {k: v for k, v in sorted(cds_translation_dict.items(),
                                                     key=lambda x: len(x[1]),
                                                     reverse=True)}
-    # Cluster by minimizers.
-    [clusters, reps_sequences, 
-     reps_groups, prot_len_dict] = cf.minimizer_clustering(cds_translation_dict,
-                                                           5,
-                                                           5,
-                                                           True,
-                                                           1, 
-                                                           clusters,
-                                                           reps_sequences, 
-                                                           reps_groups,
-                                                           1,
-                                                           constants[3], 
-                                                           constants[4],
-                                                           True)
+    # When resuming, the clustering results are saved and reused if the
+    # proteins and clustering parameters did not change.
+    checkpoint = None
+    if resume:
+        clustering_checkpoint = os.path.join(cds_output, 'checkpoint_clustering.pkl')
+        clustering_key = [sf.hash_sequence_dict(cds_translation_dict), constants[3], constants[4]]
+        checkpoint = ff.load_checkpoint(clustering_checkpoint, clustering_key)
+    if checkpoint is not None:
+        print("Loading clustering results from checkpoint...")
+        [clusters, reps_sequences, reps_groups, prot_len_dict] = checkpoint
+    else:
+        # Cluster by minimizers.
+        [clusters, reps_sequences, 
+         reps_groups, prot_len_dict] = cf.minimizer_clustering(cds_translation_dict,
+                                                               5,
+                                                               5,
+                                                               True,
+                                                               1, 
+                                                               clusters,
+                                                               reps_sequences, 
+                                                               reps_groups,
+                                                               1,
+                                                               constants[3], 
+                                                               constants[4],
+                                                               True)
+        if resume:
+            ff.save_checkpoint(clustering_checkpoint,
+                               clustering_key,
+                               [clusters, reps_sequences, reps_groups, prot_len_dict])
     # Print additional information about clustering.
     total_number_clusters = len(clusters)
-    print(f"{len(cds_translation_dict)} unique proteins have been clustered into {total_number_clusters} clusters.")
-    singleton_cluster = len([cluster for cluster in clusters if len(cluster) == 1])
-    print(f"\tOut of those clusters, {singleton_cluster} are singletons")
-    print(f"\tOut of those clusters, {total_number_clusters - singleton_cluster} have more than one CDS.")
+    singleton_cluster = sum(1 for members in clusters.values() if len(members) == 1)
+    print(f"{len(cds_translation_dict)} unique proteins have been clustered into {total_number_clusters} clusters.\n"
+          f"\tOut of those clusters, {singleton_cluster} are singletons\n"
+          f"\tOut of those clusters, {total_number_clusters - singleton_cluster} have more than one CDS.")
     
     # Reformat the clusters output, we are interested only in  the ID of cluster members.
     clusters = {cluster_rep: [value[0] for value in values]
                 for cluster_rep, values in clusters.items()}
-    # For protein hashes get only those that have more than one CDS.
-    protein_hashes = {hash_prot: cds_ids for hash_prot, cds_ids in protein_hashes.items()
-                      if len(cds_ids) > 1}
-    
-    # Add also the unique CDS ID that have the same protein as representative.
-    for cluster_rep, values in clusters.items():
-        for cds_ids in protein_hashes.values():
-            # Break since there is only one possible match in protein_hashes.
-            if cluster_rep in cds_ids:
-                clusters[cluster_rep] + cds_ids[1:]
-                break
 
     print("\nFiltering clusters...")
-    # Get frequency of cluster.
-    frequency_in_genomes = {rep: sum([frequency_cds[entry] for entry in value]) 
-                             for rep, value in clusters.items()}
-    # Filter cluster by the total sum of CDS that are present in the genomes, based on input value.
-    clusters = {rep: cluster_member for rep, cluster_member in clusters.items() 
-                if frequency_in_genomes[rep] >= constants[2]}
+    # Get frequency of cluster and filter cluster by the total sum of CDS that
+    # are present in the genomes, based on input value, in a single pass.
+    # The members frequencies are summed with map instead of building a list
+    # per cluster.
+    frequency_in_genomes = {}
+    filtered_clusters = {}
+    min_frequency = constants[2]
+    for rep, cluster_member in clusters.items():
+        frequency = sum(map(frequency_cds.__getitem__, cluster_member))
+        frequency_in_genomes[rep] = frequency
+        if frequency >= min_frequency:
+            filtered_clusters[rep] = cluster_member
+    clusters = filtered_clusters
     print(f"After filtering by CDS frequency in the genomes (>= {constants[2]}),"
           f" out of {total_number_clusters} clusters, {len(clusters)} remained.")
 
-    print("\nRetrieving kmers similiarity and coverage between representatives...")
-    reps_kmers_sim = {}
-    # Get the representatives protein sequence.
-    reps_translation_dict = {rep_id: rep_seq for rep_id, rep_seq in cds_translation_dict.items()
-                             if rep_id in clusters}
-    # Sort the representative translation dict from largest to smallest.
-    reps_translation_dict = {k: v for k, v in sorted(reps_translation_dict.items(),
-                                                     key=lambda x: len(x[1]),
-                                                     reverse=True)}
-    # recalculate the sim and cov between reps, get all of the values, so threshold
-    # is set to 0.
-    for cluster_id in reps_translation_dict:
-        kmers_rep = set(kf.determine_minimizers(reps_translation_dict[cluster_id],
-                                                5,
-                                                5,
-                                                1,
-                                                True,
-                                                True))
-        
-        reps_kmers_sim[cluster_id] = cf.select_representatives(kmers_rep,
-                                                               reps_groups,
-                                                               0,
-                                                               0,
-                                                               prot_len_dict,
-                                                               cluster_id,
-                                                               5)
-
-        reps_kmers_sim[cluster_id] = {match_values[0]: match_values[1:]
-                                      for match_values in reps_kmers_sim[cluster_id]}
-
     # Create directories.
     blast_output = os.path.join(output_directory, '2_BLAST_processing')
     ff.create_directory(blast_output)
@@ -2695,23 +2808,65 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
     # Write files for BLASTn.
     rep_paths_nuc = {}
     # Write master file for the representatives.
-    with open(representatives_all_fasta_file, 'w') as all_fasta:
+    with open(representatives_all_fasta_file, 'wb', buffering=1 << 20) as all_fasta:
         for cluster_rep_id in clusters:
-            all_fasta.write(f">{cluster_rep_id}\n{str(not_included_cds[cluster_rep_id])}\n")
+            record = b">%b\n%b\n" % (cluster_rep_id.encode('ascii'),
+                                      str(not_included_cds[cluster_rep_id]).encode('ascii'))
+            all_fasta.write(record)
 
             rep_fasta_file = os.path.join(representatives_blastn_folder,
                                           f"cluster_rep_{cluster_rep_id}.fasta")
             rep_paths_nuc[cluster_rep_id] = rep_fasta_file
             # Write the representative FASTA file.
-            with open(rep_fasta_file, 'w') as rep_fasta:
-                rep_fasta.write(f">{cluster_rep_id}\n{str(not_included_cds[cluster_rep_id])}\n")
+            with open(rep_fasta_file, 'wb') as rep_fasta:
+                rep_fasta.write(record)
     
     # Create BLAST db for the schema DNA sequences.
     print("\nCreating BLASTn database for the unclassified and missed CDSs...")
     # Get the path to the makeblastdb executable.
     makeblastdb_exec = lf.get_tool_path('makeblastdb')
     blast_db = os.path.join(blastn_output, 'blast_db_nucl', 'blast_nucleotide_db')
-    bf.make_blast_db(makeblastdb_exec, representatives_all_fasta_file, blast_db, 'nucl')
+    # makeblastdb runs in the background while the kmers similarity between
+    # representatives is computed, it is waited for before running BLAST.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as blast_db_executor:
+        blast_db_job = blast_db_executor.submit(bf.make_blast_db_if_changed,
+                                                makeblastdb_exec,
+                                                representatives_all_fasta_file,
+                                                blast_db,
+                                                'nucl')
+
+        print("\nRetrieving kmers similiarity and coverage between representatives...")
+        reps_kmers_sim = {}
+        # Get the representatives protein sequence.
+        reps_translation_dict = {rep_id: rep_seq for rep_id, rep_seq in cds_translation_dict.items()
+                                 if rep_id in clusters}
+        # Sort the representative translation dict from largest to smallest.
+        reps_translation_dict = {k: v for k, v in sorted(reps_translation_dict.items(),
+                                                         key=lambda x: len(x[1]),
+                                                         reverse=True)}
+        # recalculate the sim and cov between reps, get all of the values, so threshold
+        # is set to 0.
+        for cluster_id in reps_translation_dict:
+            kmers_rep = set(kf.determine_minimizers(reps_translation_dict[cluster_id],
+                                                    5,
+                                                    5,
+                                                    1,
+                                                    True,
+                                                    True))
+        
+            reps_kmers_sim[cluster_id] = cf.select_representatives(kmers_rep,
+                                                                   reps_groups,
+                                                                   0,
+                                                                   0,
+                                                                   prot_len_dict,
+                                                                   cluster_id,
+                                                                   5)
+
+            reps_kmers_sim[cluster_id] = {match_values[0]: match_values[1:]
+                                          for match_values in reps_kmers_sim[cluster_id]}
+
+        # Wait for the BLAST db.
+        blast_db_job.result()
 
     # Run the BLASTn and BLASTp
     [representative_blast_results,
@@ -2813,33 +2968,17 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
             frequency_in_genomes[member] = new_cluster_freq[cluster_id]
     frequency_in_genomes.update(new_cluster_freq)
 
-    print("Create graphs for the BLAST results...")
-    cds_size_dicts = {'IDs': cds_size.keys(),
-                      'Size': cds_size.values()}
-    cds_translation_size_dicts = {'IDs': cds_size.keys(),
-                                  'Size': [int(cds/3) for cds in cds_size.values()]}
-    create_graphs(report_file_path,
-                  results_output,
-                  'All_of_CDS_graphs',
-                  [[cds_size_dicts, 'histogram', "Nucleotide Size", 'Size', 'CDS'],
-                   [cds_translation_size_dicts, 'histogram','Protein Size' , 'Size', 'CDS']])
-    
-    for file in ff.get_paths_in_directory(os.path.join(results_output, 'blast_results_by_class')):
-        create_graphs(file,
-                      results_output,
-                      f"graphs_class_{os.path.basename(file).split('_')[-1].replace('.tsv', '')}")
-
     print("\nReading schema loci short FASTA files...")
     # Create directory
-    results_output = os.path.join(output_directory, '4_Schema_processing')
-    ff.create_directory(results_output)
+    schema_results_output = os.path.join(output_directory, '4_Schema_processing')
+    ff.create_directory(schema_results_output)
 
     loci_ids = [True, True]
     if_only_loci = False
     # Run Blasts for the found loci against schema short
     representative_blast_results = process_schema(schema,
                                                   groups_paths,
-                                                  results_output,
+                                                  schema_results_output,
                                                   reps_trans_dict_cds,
                                                   alleles,
                                                   frequency_in_genomes,
@@ -2849,4 +2988,32 @@ def classify_cds(schema, output_directory, allelecall_directory, constants, temp
                                                   if_only_loci,
                                                   False,
                                                   constants,
-                                                  cpu)
\ No newline at end of file
+                                                  cpu)
+
+    print("\nCreate graphs for the BLAST results...")
+    # Both graphs share the same IDs, the protein sizes use integer division.
+    cds_ids = list(cds_size)
+    cds_sizes = list(cds_size.values())
+    cds_size_dicts = {'IDs': cds_ids,
+                      'Size': cds_sizes}
+    cds_translation_size_dicts = {'IDs': cds_ids,
+                                  'Size': [size // 3 for size in cds_sizes]}
+    # The graphs are created concurrently, after the schema is processed so
+    # that no threads are running when process pools are started.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=cpu) as graphs_executor:
+        graph_jobs = [graphs_executor.submit(create_graphs,
+                                             report_file_path,
+                                             results_output,
+                                             'All_of_CDS_graphs',
+                                             [[cds_size_dicts, 'histogram', "Nucleotide Size", 'Size', 'CDS'],
+                                              [cds_translation_size_dicts, 'histogram','Protein Size' , 'Size', 'CDS']])]
+        
+        for file in ff.get_paths_in_directory(os.path.join(results_output, 'blast_results_by_class')):
+            graph_jobs.append(graphs_executor.submit(create_graphs,
+                                                     file,
+                                                     results_output,
+                                                     f"graphs_class_{os.path.basename(file).split('_')[-1].replace('.tsv', '')}"))
+
+        # Wait for the graphs, raising any error that occurred while creating them.
+        for job in graph_jobs:
+            job.result()
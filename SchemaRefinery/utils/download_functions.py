@@ -1,6 +1,177 @@
 import urllib.request
+import urllib.parse
+import urllib.error
+import http.client
+import threading
+import socket
+import shutil
 import time
 
+# persistent HTTP(S) connections, kept per worker thread and host
+thread_connections = threading.local()
+# all connections that were opened, so that they can be closed
+# when the downloads finish
+open_connections = []
+open_connections_lock = threading.Lock()
+# errors raised when the server closed an idle keep-alive connection
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected,
+                           BrokenPipeError,
+                           ConnectionResetError)
+
+def get_connection(scheme, netloc):
+    """
+    Get the persistent connection of the current thread for a host,
+    creating it if it does not exist yet.
+
+    Parameters
+    ----------
+    scheme : str
+        URL scheme, 'http' or 'https'.
+    netloc : str
+        Host (and port) of the URL.
+
+    Returns
+    -------
+    connection : http.client.HTTPConnection
+        Connection that is reused by the thread for later requests.
+    """
+    connections = getattr(thread_connections, 'connections', None)
+    if connections is None:
+        connections = thread_connections.connections = {}
+
+    connection = connections.get((scheme, netloc))
+    if connection is None:
+        connection_class = (http.client.HTTPSConnection
+                            if scheme == 'https'
+                            else http.client.HTTPConnection)
+        connection = connection_class(netloc,
+                                      timeout=socket.getdefaulttimeout() or 30)
+        connections[(scheme, netloc)] = connection
+        with open_connections_lock:
+            open_connections.append(connection)
+
+    return connection
+
+def close_connection(scheme, netloc):
+    """
+    Close and forget the persistent connection of the current thread
+    for a host.
+
+    Parameters
+    ----------
+    scheme : str
+        URL scheme, 'http' or 'https'.
+    netloc : str
+        Host (and port) of the URL.
+
+    Returns
+    -------
+    return : None
+    """
+    connections = getattr(thread_connections, 'connections', {})
+    connection = connections.pop((scheme, netloc), None)
+    if connection is not None:
+        connection.close()
+        with open_connections_lock:
+            if connection in open_connections:
+                open_connections.remove(connection)
+
+def close_all_connections():
+    """
+    Close the persistent connections opened by all threads. Should be
+    called after the threads that download files finish.
+
+    Returns
+    -------
+    return : None
+    """
+    with open_connections_lock:
+        for connection in open_connections:
+            connection.close()
+        open_connections.clear()
+
+def request_file(scheme, netloc, path):
+    """
+    Send a GET request through the persistent connection of the current
+    thread. A reused connection that was closed by the server is
+    reopened and the request is sent once more.
+
+    Parameters
+    ----------
+    scheme : str
+        URL scheme, 'http' or 'https'.
+    netloc : str
+        Host (and port) of the URL.
+    path : str
+        Path and query of the URL.
+
+    Returns
+    -------
+    response : http.client.HTTPResponse
+        The response to the request.
+    """
+    connection = get_connection(scheme, netloc)
+    # a connection with a socket was already used for a previous file
+    reused = connection.sock is not None
+    try:
+        connection.request('GET', path)
+        return connection.getresponse()
+    except STALE_CONNECTION_ERRORS:
+        close_connection(scheme, netloc)
+        if not reused:
+            raise
+
+    connection = get_connection(scheme, netloc)
+    connection.request('GET', path)
+
+    return connection.getresponse()
+
+def retrieve_file(url, file_name):
+    """
+    Download a file reusing the thread's keep-alive connection
+    to the host. URLs that are not HTTP(S), that are redirected or
+    that must go through a proxy are downloaded with urllib.
+
+    Parameters
+    ----------
+    url : str
+        An url to download a file.
+    file_name : str
+        The name of the file to be downloaded.
+
+    Returns
+    -------
+    response : tuple
+        The file name and the headers of the response.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    # only urllib applies the proxy settings of the environment
+    if parsed.scheme not in ('http', 'https') or urllib.request.getproxies():
+        return urllib.request.urlretrieve(url, file_name)
+
+    path = parsed.path or '/'
+    if parsed.query:
+        path = '{0}?{1}'.format(path, parsed.query)
+
+    try:
+        response = request_file(parsed.scheme, parsed.netloc, path)
+        if response.status == 200:
+            with open(file_name, 'wb') as outfile:
+                shutil.copyfileobj(response, outfile, 1 << 20)
+            return (file_name, response.headers)
+
+        # consume body so that the connection can be reused
+        response.read()
+    except Exception:
+        close_connection(parsed.scheme, parsed.netloc)
+        raise
+
+    if 300 <= response.status < 400:
+        return urllib.request.urlretrieve(url, file_name)
+
+    raise urllib.error.HTTPError(url, response.status, response.reason,
+                                 response.headers, None)
+
 def download_file(url, file_name, retry):
     """Accept a URL to download a file.
 
@@ -24,7 +195,7 @@ def download_file(url, file_name, retry):
     tries = 0
     while tries < retry:
         try:
-            response = urllib.request.urlretrieve(url, file_name)
+            response = retrieve_file(url, file_name)
             break
         except Exception:
             response = 'Failed: {0}'.format(file_name)
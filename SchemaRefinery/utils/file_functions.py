@@ -1,5 +1,6 @@
 import os
 import shutil
+import pickle
 import pandas as pd
 from itertools import zip_longest
 
@@ -15,11 +16,11 @@ def create_directory(dir:str):
     Returns
     -------
     return : None
-        Creates directory at desired dir path.
+        Creates directory at desired dir path, and any missing parent
+        directories.
     """
 
-    if not os.path.isdir(dir):
-        os.mkdir(dir)
+    os.makedirs(dir, exist_ok=True)
 
 def check_and_delete_file(file:str):
     """
@@ -92,11 +93,10 @@ def get_paths_in_directory(directory):
     file_paths_dict : list
         List that contains all of the file paths as values.
     """
-    # List all files and directories in the specified directory
-    all_items = os.listdir(directory)
-    
-    # Filter out only the paths of files (not directories)
-    file_paths = [os.path.join(directory, item) for item in all_items if os.path.isfile(os.path.join(directory, item))]
+    # Filter out only the paths of files (not directories), scandir entries
+    # reuse the file type read with the directory listing
+    with os.scandir(directory) as entries:
+        file_paths = [entry.path for entry in entries if entry.is_file()]
     
     return file_paths
 
@@ -114,19 +114,11 @@ def get_file_paths_dict(directory):
     file_paths_dict : dict
         Dict that contains all of the filenames as keys and file paths as values.
     """
-    file_paths_dict = {}
-    
-    # List all files and directories in the specified directory
-    all_items = os.listdir(directory)
-    
-    # Iterate over the filenames and construct the dictionary
-    for filename in all_items:
-        # Construct the file path
-        file_path = os.path.join(directory, filename)
-        # Check if it's a file (not a directory)
-        if os.path.isfile(file_path):
-            # Add to the dictionary
-            file_paths_dict[filename] = file_path
+    # Iterate over the entries and keep only files (not directories)
+    with os.scandir(directory) as entries:
+        file_paths_dict = {entry.name: entry.path
+                           for entry in entries
+                           if entry.is_file()}
     
     return file_paths_dict
 
@@ -146,14 +138,13 @@ def write_dict_to_tsv(file_path, data):
     return : None
         Write dict to file.
     """
-    with open(file_path, 'w') as f:
-        # Write headers
-        f.write('\t'.join(data.keys()) + '\n')
+    # Headers followed by the data rows, built in a single string
+    lines = ['\t'.join(data.keys())]
+    lines.extend('\t'.join(map(str, row))
+                 for row in zip_longest(*data.values(), fillvalue=''))
 
-        # Write data
-        for row in zip_longest(*data.values(), fillvalue=''):
-            row_str = '\t'.join(map(str, row))
-            f.write(row_str + '\n')
+    with open(file_path, 'w', buffering=1 << 20) as f:
+        f.write('\n'.join(lines) + '\n')
 
 def concat_files(source_file, destination_file):
     """
@@ -170,5 +161,120 @@ def concat_files(source_file, destination_file):
     -------
     None
     """
-    with open(destination_file, 'a') as outfile, open(source_file, 'r') as infile:
-        shutil.copyfileobj(infile, outfile)
\ No newline at end of file
+    with open(destination_file, 'ab') as outfile, open(source_file, 'rb') as infile:
+        copy_file_contents(infile, outfile)
+
+def concat_files_to_file(source_files, destination_file):
+    """
+    Writes the concatenation of several files to the destination file,
+    which is opened only once and overwritten if it exists. A newline is
+    added after files that do not end with one, so that the next file
+    starts in a new line.
+
+    Parameters
+    ----------
+    source_files : list
+        The paths to the source files, in the order to concatenate them.
+    destination_file : str
+        The path to the destination file.
+
+    Returns
+    -------
+    None
+    """
+    with open(destination_file, 'wb') as outfile:
+        for source_file in source_files:
+            with open(source_file, 'rb') as infile:
+                copy_file_contents(infile, outfile)
+                size = os.fstat(infile.fileno()).st_size
+                if size and os.pread(infile.fileno(), 1, size - 1) != b'\n':
+                    outfile.write(b'\n')
+
+def copy_file_contents(infile, outfile):
+    """
+    Copies the contents of an open file to the current position of another
+    open file.
+
+    Parameters
+    ----------
+    infile : file object
+        The source file, opened in binary mode.
+    outfile : file object
+        The destination file, opened in binary mode.
+
+    Returns
+    -------
+    None
+    """
+    # Copy the bytes in-kernel when possible
+    if hasattr(os, 'sendfile'):
+        # Bytes buffered by the destination must be written first
+        outfile.flush()
+        size = os.fstat(infile.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # Resume with a regular copy from where sendfile stopped
+            infile.seek(offset)
+    shutil.copyfileobj(infile, outfile, 1 << 20)
+
+def save_checkpoint(file_path, key, data):
+    """
+    Save the results of a pipeline step to a pickle file, so that they can
+    be loaded instead of recomputed when the pipeline is run again.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the checkpoint file.
+    key : object
+        Identifies the inputs and parameters used to compute the results,
+        the results are only loaded again for the same key.
+    data : object
+        The results to save.
+
+    Returns
+    -------
+    None
+    """
+    # Write to a temporary file first, an interrupted run does not leave
+    # a truncated checkpoint.
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as outfile:
+        pickle.dump([key, data], outfile, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, file_path)
+
+def load_checkpoint(file_path, key):
+    """
+    Load the results of a pipeline step saved with save_checkpoint.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the checkpoint file.
+    key : object
+        Key of the inputs and parameters of the current run.
+
+    Returns
+    -------
+    data : object or None
+        The saved results, or None if the checkpoint does not exist, can not
+        be read or was saved with a different key.
+    """
+    if not os.path.isfile(file_path):
+        return None
+
+    try:
+        with open(file_path, 'rb') as infile:
+            saved_key, data = pickle.load(infile)
+    except (EOFError, ValueError, TypeError, AttributeError,
+            ImportError, pickle.UnpicklingError):
+        return None
+
+    return data if saved_key == key else None
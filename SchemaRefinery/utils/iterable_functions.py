@@ -1,7 +1,7 @@
-from collections import OrderedDict
 import re
 import itertools
 import pickle
+from functools import lru_cache
 
 def join_list(lst, delimiter):
     """
@@ -483,6 +483,24 @@ def partially_contains_fragment_of_list(target_list, list_of_lists):
             return True
     return False
 
+@lru_cache(maxsize=None)
+def is_literal_pattern(pattern):
+    """
+    Check if a regex pattern has no special characters, in which case it
+    only matches itself and plain string methods can be used instead.
+
+    Parameters
+    ----------
+    pattern : str
+        The regex pattern to check.
+
+    Returns
+    -------
+    return : bool
+        True if the pattern is a literal string, False otherwise.
+    """
+    return re.escape(pattern) == pattern
+
 def remove_by_regex(string, pattern):
     """
     Remove all occurrences of a pattern from a string.
@@ -499,6 +517,8 @@ def remove_by_regex(string, pattern):
     return : str
         The string with all occurrences of the pattern removed.
     """
+    if is_literal_pattern(pattern):
+        return string.replace(pattern, '')
     return re.sub(pattern, '', string)
 
 def replace_by_regex(string, pattern, replacement):
@@ -532,6 +552,9 @@ def replace_by_regex(string, pattern, replacement):
     >>> replace_by_regex(text, pattern, replacement)
     'Hello number, meet number.'
     """
+    # Backslashes in the replacement are escapes for re.sub.
+    if is_literal_pattern(pattern) and '\\' not in replacement:
+        return string.replace(pattern, replacement)
     return re.sub(pattern, replacement, string)
 
 def regex_present(regex_list, string):
@@ -711,11 +734,21 @@ def sort_subdict_by_tuple(dict, order):
     >>> order = ('1a', '1b', '2a', '3a', '2b', '1c', '3b', '4a', '4b', '4c', '5')
     >>> sorted_data = sort_subdict_by_tuple(data, order)
     >>> sorted_data
-    {'cds1|cds2': OrderedDict([('1a', 30), ('3b', 40)]), 'cds3|cds4': OrderedDict([('1a', 30), ('3b', 20)])}
+    {'cds1|cds2': {'1a': 30, '3b': 40}, 'cds3|cds4': {'1a': 30, '3b': 20}}
     """
+    # Position of each key in the order tuple, computed once
+    rank = {}
+    for index, order_key in enumerate(order):
+        rank.setdefault(order_key, index)
+    missing_rank = len(order)
+
     sorted_data = {}
     for key, subdict in dict.items():
+        # Sub-dictionaries with a single key are already sorted
+        if len(subdict) < 2:
+            sorted_data[key] = subdict
+            continue
         # Sorting the sub-dictionary by the index of its keys in the order tuple
-        sorted_subdict = OrderedDict(sorted(subdict.items(), key=lambda item: order.index(item[0]) if item[0] in order else len(order)))
-        sorted_data[key] = sorted_subdict
+        sorted_data[key] = {k: v for k, v in sorted(subdict.items(),
+                                                    key=lambda item: rank.get(item[0], missing_rank))}
     return sorted_data
\ No newline at end of file
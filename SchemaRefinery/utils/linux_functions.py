@@ -1,8 +1,11 @@
 import shutil
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def get_tool_path(name):
     """
-    Get the path of the specified tool.
+    Get the path of the specified tool. The PATH is only searched the first
+    time that each tool is requested.
 
     Parameters
     ----------
@@ -16,4 +19,4 @@ def get_tool_path(name):
     """
 
     # Get the path of the tool
-    return shutil.which(name)
\ No newline at end of file
+    return shutil.which(name)
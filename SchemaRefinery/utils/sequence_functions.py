@@ -1,4 +1,9 @@
+import os
+import re
+import mmap
 import hashlib
+import concurrent.futures
+from itertools import repeat
 from Bio.Seq import Seq
 from Bio import SeqIO
 
@@ -7,6 +12,11 @@ try:
 except ModuleNotFoundError:
     from SchemaRefinery.RefineSchema.constants import DNA_BASES
 
+# Number of processed sequences between progress updates
+PROGRESS_STEP = 1000
+# Identifier of each FASTA header
+FASTA_ID_PATTERN = re.compile(rb'^>[ \t]*(\S*)', re.MULTILINE)
+
 def check_str_alphabet(input_string, alphabet):
     """
     Verifies if all characters in the input string are present in the specified alphabet.
@@ -244,6 +254,90 @@ def read_fasta_file_iterator(file):
     """
     return SeqIO.parse(file, "fasta")
 
+def read_fasta_file_bytes(file):
+    """
+    Reads a FASTA file through a memory map and yields the records without
+    creating Biopython objects.
+
+    Parameters
+    ----------
+    file : str
+        Path to the FASTA file.
+
+    Returns
+    -------
+    return : generator
+        Yields tuples with the sequence identifier (str) and the sequence
+        (bytes, without line breaks).
+    """
+    with open(file, 'rb') as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from read_fasta_buffer(buffer)
+
+def read_fasta_buffer(buffer):
+    """
+    Yields the records of FASTA data that is already in memory, such as the
+    contents of a file that was read for another purpose.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        FASTA data.
+
+    Returns
+    -------
+    return : generator
+        Yields tuples with the sequence identifier (str) and the sequence
+        (bytes, without line breaks and spaces).
+    """
+    # Text before the first header is skipped
+    if buffer[:1] == b'>':
+        start = 0
+    else:
+        start = buffer.find(b'\n>')
+        if start != -1:
+            start += 1
+    while start != -1:
+        header_end = buffer.find(b'\n', start)
+        if header_end == -1:
+            header_end = len(buffer)
+        next_start = buffer.find(b'\n>', header_end)
+        end = len(buffer) if next_start == -1 else next_start
+        # identifier is the first word of the header
+        header = buffer[start + 1:header_end].split(None, 1)
+        seq_id = header[0].decode() if header else ''
+        # Spaces are removed, as done by Biopython's SimpleFastaParser
+        sequence = buffer[header_end:end].translate(None, b' \r\n')
+        yield seq_id, sequence
+        start = next_start if next_start == -1 else next_start + 1
+
+def fetch_fasta_ids(file_path):
+    """
+    Fetches the sequence identifiers of a FASTA file, only the headers are
+    parsed.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the FASTA file.
+
+    Returns
+    -------
+    return : list
+        The sequence identifiers in the order they appear in the file.
+    """
+    with open(file_path, 'rb') as fasta_file:
+        if os.fstat(fasta_file.fileno()).st_size == 0:
+            return []
+        # The headers are matched in the memory map, the sequences are
+        # never copied into Python objects.
+        with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # identifier is the first word of each header
+            return [seq_id.decode()
+                    for seq_id in FASTA_ID_PATTERN.findall(buffer)]
+
 def read_fasta_file_dict(file):
     """
     Reads a FASTA file and returns a dictionary where the keys are sequence identifiers and the values are sequence records.
@@ -277,6 +371,27 @@ def seq_to_hash(seq):
 
     return hashlib.sha256(seq.encode('utf-8')).hexdigest()
 
+def hash_sequence_dict(seq_dict):
+    """
+    Computes a single hash for all of the IDs and sequences in a dict,
+    taking their order into account.
+
+    Parameters
+    ----------
+    seq_dict : dict
+        Dict that contains sequence ID as key and the sequence as value.
+
+    Returns
+    -------
+    return : str
+        Returns a hash string.
+    """
+    dict_hash = hashlib.sha256()
+    for seq_id, sequence in seq_dict.items():
+        dict_hash.update(f'>{seq_id}\n{sequence}\n'.encode('utf-8'))
+
+    return dict_hash.hexdigest()
+
 def hash_sequences(file_path):
     """
     Hashes sequences in fasta file based on input file_path.
@@ -293,13 +408,13 @@ def hash_sequences(file_path):
     """
 
     hash_set = set()
-    for rec in read_fasta_file_iterator(file_path):
-        hash_set.add(seq_to_hash(str(rec.seq)))
+    for _, sequence in read_fasta_file_bytes(file_path):
+        hash_set.add(seq_to_hash(sequence.decode()))
 
     return hash_set
 
 def translate_seq_deduplicate(seq_dict, path_to_write, untras_path, min_len, count_seq,
-                              translation_table, deduplicate = True):
+                              translation_table, deduplicate = True, cpu = 1):
     """
     Translates the DNA sequence to protein and verifies if that protein is alredy
     present in the dict, thus ensuring that the dict contains deduplicated sequences,
@@ -309,8 +424,9 @@ def translate_seq_deduplicate(seq_dict, path_to_write, untras_path, min_len, cou
     ----------
     seq_dict : dict
         Dict that contains sequence ID as key and the sequence as value.
-    path_to_write : str
-        Path to the file to create and write.
+    path_to_write : str or file object
+        Path to the file to create and write, or an open file to which
+        the translations are appended (it is not closed).
     untras_path : str or None
         Path to write untranslated sequences, if there is no need to write use None
     min_len : int
@@ -319,13 +435,16 @@ def translate_seq_deduplicate(seq_dict, path_to_write, untras_path, min_len, cou
         If there is need to print into stdout the number of processed sequences.
     deduplicate : bool, optional
         If the process of sequence deduplication is needed.
+    cpu : int, optional
+        Number of processes used to translate the sequences. The results
+        are processed in the input order, so the output does not change.
     
     Returns
     -------
     translation_dict : dict
         Dict that contais sequence ID as key and translated sequence as value.
     protein_hashes : dict
-        Dict that contais sequence hash as key and sequences IDs as values.
+        Dict that contais the protein sequence as key and sequences IDs as values.
     untras_seq : dict
         Dict that contains untranslated id as key and error as value.
     """
@@ -335,18 +454,30 @@ def translate_seq_deduplicate(seq_dict, path_to_write, untras_path, min_len, cou
     if count_seq:
         total = len(seq_dict)
         
-    with open(path_to_write, 'w+') as translation:
-        for i, (id_s, sequence) in enumerate(seq_dict.items(),1):
-                
-            # Translate
-            protein_translation = translate_dna(str(sequence),
-                                                    translation_table,
-                                                    min_len,
-                                                    True)
+    # Translate
+    executor = None
+    if cpu > 1 and len(seq_dict) > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=cpu)
+        chunksize = max(1, len(seq_dict) // (cpu * 4))
+        translations = executor.map(translate_dna,
+                                    [str(sequence) for sequence in seq_dict.values()],
+                                    repeat(translation_table),
+                                    repeat(min_len),
+                                    repeat(True),
+                                    chunksize=chunksize)
+    else:
+        translations = (translate_dna(str(sequence), translation_table, min_len, True)
+                        for sequence in seq_dict.values())
+
+    # Several calls can stream their translations to the same open file
+    opened = isinstance(path_to_write, str)
+    translation = open(path_to_write, 'w+', buffering=1 << 20) if opened else path_to_write
+    try:
+        for i, (id_s, protein_translation) in enumerate(zip(seq_dict, translations), 1):
             # Verify if was translated
             if type(protein_translation) == list:
                 protein_translation = str(protein_translation[0][0])
-                if count_seq:
+                if count_seq and (i % PROGRESS_STEP == 0 or i == total):
                     print(f"\rTranslated {i}/{total} CDS", end='', flush=True)
             else:
                 if count_seq:
@@ -355,8 +486,9 @@ def translate_seq_deduplicate(seq_dict, path_to_write, untras_path, min_len, cou
                 continue
             
             if deduplicate:
-                # Hash the sequence
-                prot_hash = seq_to_hash(protein_translation)
+                # Use the protein itself as key, the dict hashes it in C and
+                # the string is shared with translation_dict
+                prot_hash = protein_translation
                 # Find unique proteins
                 if prot_hash not in protein_hashes:
                     protein_hashes[prot_hash] = [id_s]
@@ -368,6 +500,11 @@ def translate_seq_deduplicate(seq_dict, path_to_write, untras_path, min_len, cou
             else:
                 translation_dict[id_s] = protein_translation
                 translation.write(f'>{id_s}\n{protein_translation}\n')
+    finally:
+        if opened:
+            translation.close()
+        if executor is not None:
+            executor.shutdown()
     if untras_seq and untras_path:
         with open(untras_path, 'w+') as untras_file:
             for id_s, exceptions in untras_seq.items():
@@ -389,17 +526,19 @@ def fetch_fasta_dict(file_path, count_seq):
     Returns
     -------
     fasta_dict : dict
-        Returns dict with key as fasta header and value as fasta sequence.
+        Returns dict with key as fasta header and value as fasta sequence (str).
     """
     
     fasta_dict = {}
-    i = 1
-    # Read FASTA files
-    for rec in read_fasta_file_iterator(file_path):
-        if count_seq:
+    i = 0
+    # Read FASTA files through a memory map, without Biopython records
+    for i, (seq_id, sequence) in enumerate(read_fasta_file_bytes(file_path), 1):
+        if count_seq and i % PROGRESS_STEP == 0:
             print(f"\rProcessed {i} CDS", end='', flush=True)
-            i += 1
-        fasta_dict[rec.id] = rec.seq
+        fasta_dict[seq_id] = sequence.decode()
+
+    if count_seq:
+        print(f"\rProcessed {i} CDS", end='', flush=True)
 
     return fasta_dict
 
@@ -26,106 +26,231 @@ Outputs:
 """
 
 import os
+import sys
 import argparse
-import re
+import string
 import concurrent.futures
 from itertools import repeat
-from Bio import SeqIO
+import numpy as np
+from Bio.SeqIO.FastaIO import SimpleFastaParser
 
+try:
+    from numba import njit
+except ModuleNotFoundError:
+    njit = None
 
 
-def split(fasta, min_N):
+# translation table to uppercase sequences at the byte level
+UPPERCASE = bytes.maketrans(string.ascii_lowercase.encode(),
+                            string.ascii_uppercase.encode())
 
+# buffer size for output files, avoids many small write calls
+WRITE_BUFFER = 1 << 20
+
+def scan_N_runs(seq_array, min_N):
     """
-    Splits by min_N consecutive Ns in to new contigs
+    Scans a sequence for runs of at least min_N consecutive Ns and
+    returns the boundaries of the segments between them.
 
     Arguments:
-        fasta: str
-            assembly path
+        seq_array : numpy.ndarray
+            uint8 view of the uppercase sequence
 
         min_N : int
-            cuts by >= min_N consecutive Ns
+            minimum number of consecutive Ns
+
+    Returns :
+        bounds : numpy.ndarray
+            flat array with the start and end of each segment
+    """
+    length = seq_array.shape[0]
+    bounds = np.empty(length + 4, dtype=np.int64)
+    count = 0
+    contig_start = 0
+    run = 0
+    for i in range(length):
+        if seq_array[i] == 78:
+            run += 1
+        else:
+            if run >= min_N:
+                bounds[count] = contig_start
+                bounds[count + 1] = i - run
+                count += 2
+                contig_start = i
+            run = 0
+
+    if run >= min_N:
+        bounds[count] = contig_start
+        bounds[count + 1] = length - run
+        count += 2
+        contig_start = length
+
+    bounds[count] = contig_start
+    bounds[count + 1] = length
+    count += 2
+
+    return bounds[:count]
+
+
+# JIT-compiled scanner, releases the GIL while running
+if njit is not None:
+    scan_N_runs = njit(cache=True, nogil=True)(scan_N_runs)
+
+
+def split_by_N(seq, min_N):
+    """
+    Splits a sequence by runs of at least min_N consecutive Ns.
+
+    Run boundaries are found with the Numba compiled scanner when numba
+    is installed, or with a vectorized NumPy scan over the sequence
+    bytes otherwise. Equivalent to splitting with the regex N{min_N,}.
+
+    Arguments:
+        seq : bytes
+            uppercase sequence
+
+        min_N : int
+            minimum number of consecutive Ns
 
     Returns :
-        locus_mean : list
-            containing ordered contigs, fasta path and identifier to add to new contigs
+        contigs : list
+            sequence segments between N runs (may contain empty segments)
+    """
+    if njit is not None:
+        bounds = scan_N_runs(np.frombuffer(seq, dtype=np.uint8), min_N).tolist()
+        return [seq[bounds[i]:bounds[i + 1]] for i in range(0, len(bounds), 2)]
+
+    # pad with False so that runs at the edges are closed
+    is_N = np.zeros(len(seq) + 2, dtype=np.int8)
+    is_N[1:-1] = np.frombuffer(seq, dtype=np.uint8) == 78
+    diff = np.diff(is_N)
+    run_starts = np.flatnonzero(diff == 1)
+    run_ends = np.flatnonzero(diff == -1)
+    long_runs = (run_ends - run_starts) >= min_N
+
+    contig_starts = [0] + run_ends[long_runs].tolist()
+    contig_ends = run_starts[long_runs].tolist() + [len(seq)]
+
+    return [seq[start:end] for start, end in zip(contig_starts, contig_ends)]
+
+
+def split(fasta, min_N, outputs):
+
     """
-    if sum([rec.seq.count('N') for rec in SeqIO.parse(fasta, 'fasta')]) != 0:
+    Splits by min_N consecutive Ns in to new contigs and writes them
+    to the output folder.
 
-        records = SeqIO.parse(fasta, 'fasta')
+    Contigs are written to a temporary file that only replaces the
+    output file if Ns were found, so that an assembly is never left
+    half written or truncated in the output folder.
 
-        contigs = {rec.id : re.split("N{"+ str(min_N) + ",100000}", str(rec.seq.upper())) for rec in records}
+    Arguments:
+        fasta: str
+            assembly path
+
+        min_N : int
+            cuts by >= min_N consecutive Ns
 
-        return [contigs,fasta]
+        outputs : str
+            output folder where the split assembly is written
 
-    else:
-        return [None,fasta]
+    Returns :
+        status : tuple
+            assembly file name, number of new contigs (None if no Ns
+            were detected, no file is kept in that case) and 'OK' or
+            the error raised while splitting the assembly
+    """
+    name = os.path.basename(fasta)
+    output_file = os.path.join(outputs, name)
+    temp_file = output_file + '.tmp'
+    newcontigs = 0
+    has_N = False
+    try:
+        # single pass over the assembly, writing contigs as they are split
+        with open(fasta, 'r') as handle, open(temp_file, 'wb', buffering=WRITE_BUFFER) as file:
+            for title, seq in SimpleFastaParser(handle):
+                seq = seq.encode().translate(UPPERCASE)
+                if b'N' in seq:
+                    has_N = True
+                # record identifier is the first word of the header
+                header = title.split(None, 1)[0].encode()
+                contigs = [contig for contig in split_by_N(seq, min_N) if len(contig) > 0]
+                file.write(b"".join(b">%s_%d\n%s\n" % (header, index, contig)
+                                    for index, contig in enumerate(contigs)))
+                newcontigs += max(len(contigs) - 1, 0)
+
+        if has_N:
+            os.replace(temp_file, output_file)
+        else:
+            os.remove(temp_file)
+            newcontigs = None
+    except Exception as e:
+        if os.path.isfile(temp_file):
+            os.remove(temp_file)
+        return (name, None, '{0}: {1}'.format(type(e).__name__, e))
+
+    return (name, newcontigs, 'OK')
 
 def main(inputs, outputs, min_N,threads):
     """
     main body of the script
     """
 
+    # split assemblies would replace the input files
+    if os.path.realpath(outputs) == os.path.realpath(inputs):
+        sys.exit("\nError: The output folder must be different from the input folder.")
+
     if not os.path.exists(outputs):
         os.mkdir(outputs)
 
     print("Reading folder")
 
-    fastas = []
-
-    for path in os.listdir(inputs):
-
-        if os.path.isfile(os.path.join(inputs,path)):
-
-            fastas.append(os.path.join(inputs,path))
+    fastas = [entry.path for entry in os.scandir(inputs) if entry.is_file()]
 
     print("Removing N and splitting into contigs")
 
     """
-    Multithreading:
+    Multiprocessing:
         arguments:
             function : split
             input 1 : list
                 all assemblies path
             input 2 : int
                 repeats of min_N
+            input 3 : str
+                repeats of output folder
     
         output: fasta file format
-            creates fasta file format at output folder
+            each worker creates its fasta file at output folder
     """
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+    # splitting is CPU-bound, use processes to avoid the GIL
+    chunksize = max(1, len(fastas) // (threads * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=threads) as executor:
         
-        for res in executor.map(split, fastas,repeat(min_N)):
-
-
-            newcontigs = 0
-
-            if res[0] != None:
-            
-                with open(os.path.join(outputs,res[1].split("/")[-1]),'w+') as file:
-
-                    for (id,contigs) in res[0].items():
-                        index = 0
-                        for fasta in contigs:
-
-                            if len(fasta) > 0 :
-                                    
-                                file.write(f">{id}_{index}\n")
-                                file.write(fasta + "\n")
-
-                                if index != 0:
-                                    newcontigs += 1
-                                
-                                index += 1
-
-                print(res[1].split("/")[-1])
-                print("new contigs = {}".format(newcontigs))
-            
+        processed = 0
+        total_newcontigs = 0
+        without_N = 0
+        failed = []
+        for name, newcontigs, status in executor.map(split, fastas, repeat(min_N),
+                                                     repeat(outputs), chunksize=chunksize):
+
+            processed += 1
+            if status != 'OK':
+                failed.append((name, status))
+            elif newcontigs is not None:
+                total_newcontigs += newcontigs
             else:
+                without_N += 1
+            print('\r', 'Processed {0}/{1}'.format(processed, len(fastas)), end='')
+
+    print("\nNo Ns detected in {0} assemblies.".format(without_N))
+    print("new contigs = {}".format(total_newcontigs))
 
-                print(res[1].split("/")[-1])
-                print("No Ns detected.")
+    if failed:
+        print("Could not split {0} assemblies:".format(len(failed)))
+        for name, status in failed:
+            print("{0}: {1}".format(name, status))
 
 def parse_arguments():
 
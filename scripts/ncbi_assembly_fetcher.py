@@ -125,22 +125,20 @@ def main(input_table, output_directory, file_extension,
             assembly_latest.append(row[0])
 
     # removing suppressed genomes from refseq_assemblies_ids and refseq_urls
-    suppressed = []
-    for i in refseq_assemblies_ids:
-        processed_id = '_'.join(i.split('_')[0:2])
+    # keep mask is built in a single scan with set lookups
+    assembly_latest = set(assembly_latest)
+    keep = ['_'.join(i.split('_')[0:2]) in assembly_latest
+            for i in refseq_assemblies_ids]
 
-        if processed_id not in assembly_latest:
-            suppressed.append(refseq_assemblies_ids.index(i))
-
-    print('Found {0} ids suppressed from RefSeq.'.format(len(suppressed)))
+    print('Found {0} ids suppressed from RefSeq.'.format(keep.count(False)))
 
     # remove suppressed from lists
     refseq_assemblies_ids = [j
-                             for i, j in enumerate(refseq_assemblies_ids)
-                             if i not in suppressed]
+                             for j, kept in zip(refseq_assemblies_ids, keep)
+                             if kept]
     refseq_urls = [j
-                   for i, j in enumerate(refseq_urls)
-                   if i not in suppressed]
+                   for j, kept in zip(refseq_urls, keep)
+                   if kept]
 
     urls = refseq_urls + genbank_urls
     assemblies_ids = refseq_assemblies_ids + genbank_assemblies_ids
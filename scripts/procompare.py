@@ -183,22 +183,29 @@ def proCompare(dataStructure, key1, key2,absent):
             # group two        
             group_two = set(value[key2])        
             
-            # common alleles in the two groups        
-            common_alleles = len(group_one.intersection(group_two))        
+            # common alleles in the two groups, intersect from the smaller set
+            if len(group_one) <= len(group_two):
+                shared_ids = group_one & group_two
+            else:
+                shared_ids = group_two & group_one
+            common_alleles = len(shared_ids)        
             
+            # Alleles present only in group one
+            group_one_exclusive = group_one - shared_ids
+
             if common_alleles != 0:            
                 shared_allele.append(gene)        
-                allele_id_shared.append(group_one.intersection(group_two))
+                allele_id_shared.append(shared_ids)
 
             else:            
                 exclusive_alleles.append(gene)
-                allele_id_exclusive.append(group_one.difference(group_two))        
+                allele_id_exclusive.append(group_one_exclusive)        
                 
             # Alleles present only in group one        
-            group_one_diff = len(group_one.difference(group_two))        
+            group_one_diff = len(group_one_exclusive)        
             
             # Alleles present only in group two        
-            group_two_diff = len(group_two.difference(group_one))        
+            group_two_diff = len(group_two) - common_alleles        
             
             value['Stats'] = [group_one, group_two, common_alleles, group_one_diff, group_two_diff] # shows alleles id for each group, how many common, and how many different
         
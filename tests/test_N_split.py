@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+"""Tests for the N run splitting in `scripts/N_split.py`."""
+
+import os
+import re
+import sys
+import importlib.util
+
+import numpy as np
+import pytest
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_PATH = os.path.join(os.path.dirname(TESTS_DIR), 'scripts', 'N_split.py')
+
+
+@pytest.fixture(scope='module')
+def N_split():
+    """The N_split script, imported as a module."""
+    spec = importlib.util.spec_from_file_location('N_split', SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # numba looks the module up by name when loading cached functions
+    sys.modules['N_split'] = module
+    spec.loader.exec_module(module)
+    yield module
+    del sys.modules['N_split']
+
+
+SEQUENCES = [b'',
+             b'ACGT',
+             b'N',
+             b'NNNN',
+             b'ANA',
+             b'ANNA',
+             b'NNACGTNN',
+             b'ACNNNGTNNNNAC',
+             b'ACNGTNNA',
+             b'NANNANNNA']
+
+
+@pytest.mark.parametrize('min_N', [1, 2, 3])
+@pytest.mark.parametrize('seq', SEQUENCES)
+def test_split_by_N(N_split, seq, min_N):
+    """Segments are the same as splitting with the regex N{min_N,}."""
+    expected = re.split(rb'N{%d,}' % min_N, seq)
+
+    assert N_split.split_by_N(seq, min_N) == expected
+
+
+@pytest.mark.parametrize('min_N', [1, 2, 3])
+@pytest.mark.parametrize('seq', SEQUENCES)
+def test_split_by_N_numpy(N_split, monkeypatch, seq, min_N):
+    """The NumPy scan used without numba gives the same segments."""
+    monkeypatch.setattr(N_split, 'njit', None)
+    expected = re.split(rb'N{%d,}' % min_N, seq)
+
+    assert N_split.split_by_N(seq, min_N) == expected
+
+
+@pytest.mark.parametrize('min_N', [1, 2, 3])
+@pytest.mark.parametrize('seq', SEQUENCES)
+def test_scan_N_runs(N_split, seq, min_N):
+    """Boundaries delimit the segments between N runs."""
+    seq_array = np.frombuffer(seq, dtype=np.uint8)
+    bounds = N_split.scan_N_runs(seq_array, min_N).tolist()
+    segments = [seq[bounds[i]:bounds[i + 1]] for i in range(0, len(bounds), 2)]
+
+    assert len(bounds) % 2 == 0
+    assert segments == re.split(rb'N{%d,}' % min_N, seq)
+
+
+def test_split(N_split, tmp_path):
+    """Contigs are split by N runs and renamed, lowercase Ns included."""
+    inputs = tmp_path / 'inputs'
+    outputs = tmp_path / 'outputs'
+    inputs.mkdir()
+    outputs.mkdir()
+    fasta = inputs / 'assembly.fasta'
+    fasta.write_text('>contig1 description\nACnnGT\nAC\n'
+                     '>contig2\nNNNN\n'
+                     '>contig3\nACGT\n')
+
+    status = N_split.split(str(fasta), 2, str(outputs))
+
+    assert status == ('assembly.fasta', 1, 'OK')
+    assert (outputs / 'assembly.fasta').read_text() == ('>contig1_0\nAC\n'
+                                                       '>contig1_1\nGTAC\n'
+                                                       '>contig3_0\nACGT\n')
+    assert os.listdir(outputs) == ['assembly.fasta']
+
+
+def test_split_without_N(N_split, tmp_path):
+    """No file is kept for assemblies without Ns."""
+    fasta = tmp_path / 'assembly.fasta'
+    fasta.write_text('>contig1\nACGT\n')
+    outputs = tmp_path / 'outputs'
+    outputs.mkdir()
+
+    status = N_split.split(str(fasta), 2, str(outputs))
+
+    assert status == ('assembly.fasta', None, 'OK')
+    assert os.listdir(outputs) == []
+
+
+def test_split_error(N_split, tmp_path):
+    """Errors are returned and no partial file is left behind."""
+    fasta = tmp_path / 'assembly.fasta'
+    fasta.write_bytes(b'>contig1\nACNNGT\n>contig2\n\xff\xfe\n')
+    outputs = tmp_path / 'outputs'
+    outputs.mkdir()
+
+    name, newcontigs, status = N_split.split(str(fasta), 2, str(outputs))
+
+    assert (name, newcontigs) == ('assembly.fasta', None)
+    assert status.startswith('UnicodeDecodeError')
+    assert os.listdir(outputs) == []
+
+
+def test_main_same_folder(N_split, tmp_path):
+    """The input assemblies are never overwritten."""
+    fasta = tmp_path / 'assembly.fasta'
+    fasta.write_text('>contig1\nACNNGT\n')
+
+    with pytest.raises(SystemExit):
+        N_split.main(str(tmp_path), str(tmp_path) + '/', 2, 1)
+
+    assert fasta.read_text() == '>contig1\nACNNGT\n'
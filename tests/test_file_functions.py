@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+"""Tests for `utils.file_functions` and the `--resume` option."""
+
+import pickle
+
+import pytest
+
+from SchemaRefinery.utils import file_functions as ff
+
+
+def test_concat_files_to_file(tmp_path):
+    """Each file starts in a new line, even after files without one."""
+    contents = [b'>a\nACGT', b'', b'>b\nGG\n', b'>c\nTT']
+    source_files = []
+    for i, content in enumerate(contents):
+        source_file = tmp_path / f'source{i}.fasta'
+        source_file.write_bytes(content)
+        source_files.append(str(source_file))
+    destination_file = tmp_path / 'destination.fasta'
+    destination_file.write_bytes(b'previous contents\n')
+
+    ff.concat_files_to_file(source_files, str(destination_file))
+
+    assert destination_file.read_bytes() == b'>a\nACGT\n>b\nGG\n>c\nTT\n'
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """Saved results are loaded for the same key."""
+    checkpoint = str(tmp_path / 'checkpoint.pkl')
+    data = [{'rep': ['cds1', 'cds2']}, {'rep': 'MKV'}]
+
+    ff.save_checkpoint(checkpoint, ['hash', 0.9, 0.9], data)
+
+    assert ff.load_checkpoint(checkpoint, ['hash', 0.9, 0.9]) == data
+    assert not (tmp_path / 'checkpoint.pkl.tmp').exists()
+
+
+def test_checkpoint_different_key(tmp_path):
+    """Results computed with other inputs or parameters are not loaded."""
+    checkpoint = str(tmp_path / 'checkpoint.pkl')
+    ff.save_checkpoint(checkpoint, ['hash', 0.9, 0.9], {'rep': []})
+
+    assert ff.load_checkpoint(checkpoint, ['other_hash', 0.9, 0.9]) is None
+    assert ff.load_checkpoint(checkpoint, ['hash', 0.8, 0.9]) is None
+
+
+def test_checkpoint_overwritten(tmp_path):
+    """A new checkpoint replaces the previous one."""
+    checkpoint = str(tmp_path / 'checkpoint.pkl')
+    ff.save_checkpoint(checkpoint, 'key1', 'first')
+    ff.save_checkpoint(checkpoint, 'key2', 'second')
+
+    assert ff.load_checkpoint(checkpoint, 'key1') is None
+    assert ff.load_checkpoint(checkpoint, 'key2') == 'second'
+
+
+def test_checkpoint_missing(tmp_path):
+    """Nothing is loaded if the checkpoint does not exist."""
+    assert ff.load_checkpoint(str(tmp_path / 'checkpoint.pkl'), 'key') is None
+
+
+@pytest.mark.parametrize('contents', [b'',
+                                      b'not a pickle',
+                                      pickle.dumps(5),
+                                      pickle.dumps(['key', 'data', 'extra']),
+                                      b'cno_such_module\nThing\n.',
+                                      b'cos\nno_such_function\n.'])
+def test_checkpoint_unreadable(tmp_path, contents):
+    """Truncated, corrupted or incompatible checkpoints are ignored."""
+    checkpoint = tmp_path / 'checkpoint.pkl'
+    checkpoint.write_bytes(contents)
+
+    assert ff.load_checkpoint(str(checkpoint), 'key') is None
+
+
+@pytest.mark.parametrize('resume', [False, True])
+def test_unclassified_cds_resume(tmp_path, monkeypatch, resume):
+    """The resume option is passed on to classify_cds."""
+    pytest.importorskip('networkx')
+    from SchemaRefinery.RefineSchema import UnclassifiedCDS
+
+    allelecall_directory = tmp_path / 'allelecall'
+    (allelecall_directory / 'temp').mkdir(parents=True)
+    (allelecall_directory / 'unclassified_sequences.fasta').write_text('')
+    calls = []
+    monkeypatch.setattr(UnclassifiedCDS.cof, 'classify_cds',
+                        lambda *args: calls.append(args))
+
+    UnclassifiedCDS.main('schema', str(tmp_path / 'output'),
+                         str(allelecall_directory),
+                         0.8, 70, 0.9, 0.9, 0, 201, 11, 1, resume)
+
+    assert len(calls) == 1
+    assert calls[0][-1] is resume
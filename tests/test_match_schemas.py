@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""Tests for the BLAST results parsing in `SchemaAnnotation.match_schemas`."""
+
+from SchemaRefinery.SchemaAnnotation import match_schemas as ms
+
+
+def write_blast_output(path, lines):
+    """Write BLAST tabular output with one hit per line."""
+    path.write_text(''.join('\t'.join(fields) + '\n' for fields in lines))
+    return str(path)
+
+
+def test_iter_top_hits_first_hsp(tmp_path):
+    """Only the first HSP of each query and subject pair is yielded."""
+    blast_output = write_blast_output(tmp_path / 'results.tsv',
+                                      [('q1', 's1', '500'),
+                                       ('q1', 's1', '120'),
+                                       ('q1', 's2', '300'),
+                                       ('q2', 's1', '250'),
+                                       ('q2', 's1', '90'),
+                                       ('q2', 's1', '40')])
+
+    assert list(ms.iter_top_hits(blast_output)) == [('q1', 's1', '500'),
+                                                    ('q1', 's2', '300'),
+                                                    ('q2', 's1', '250')]
+
+
+def test_iter_top_hits_score_last_column(tmp_path):
+    """The score is read from the last column."""
+    blast_output = write_blast_output(tmp_path / 'results.tsv',
+                                      [('q1', 's1', '99.5', '1', '450')])
+
+    assert list(ms.iter_top_hits(blast_output)) == [('q1', 's1', '450')]
+
+
+def test_iter_top_hits_pair_not_contiguous(tmp_path):
+    """A pair is yielded again if its HSPs are not contiguous."""
+    blast_output = write_blast_output(tmp_path / 'results.tsv',
+                                      [('q1', 's1', '500'),
+                                       ('q1', 's2', '300'),
+                                       ('q1', 's1', '100')])
+
+    assert list(ms.iter_top_hits(blast_output)) == [('q1', 's1', '500'),
+                                                    ('q1', 's2', '300'),
+                                                    ('q1', 's1', '100')]
+
+
+def test_iter_top_hits_empty(tmp_path):
+    """An empty BLAST output has no hits."""
+    blast_output = write_blast_output(tmp_path / 'results.tsv', [])
+
+    assert list(ms.iter_top_hits(blast_output)) == []
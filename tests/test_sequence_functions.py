@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""Tests for the FASTA readers in `utils.sequence_functions`."""
+
+import pytest
+
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+from SchemaRefinery.utils import sequence_functions as sf
+
+
+FASTA_CASES = {
+    'wrapped_lines': b'>a desc\nACGT\nAC\n>b\nGG\nTT\n',
+    'crlf_line_endings': b'>a desc\r\nACGT\r\nAC\r\n>b\r\nGG\r\n',
+    'empty_records': b'>a\n>b\nACGT\n>c\n',
+    'header_without_newline': b'>a\nACGT\n>b',
+    'sequence_without_newline': b'>a\nACGT',
+    'empty_file': b'',
+    'spaces_in_sequence': b'>a\nNN NN\nAC GT\n',
+    'blank_lines': b'>a\nAC\n\nGT\n\n>b\nT\n',
+    'text_before_first_record': b'comment\n\n>a\nAC\n',
+}
+
+
+def simple_fasta_records(path):
+    """Records of a FASTA file as parsed by Biopython."""
+    with open(path) as handle:
+        return [(title.split(None, 1)[0], sequence)
+                for title, sequence in SimpleFastaParser(handle)]
+
+
+@pytest.fixture(params=sorted(FASTA_CASES))
+def fasta_file(request, tmp_path):
+    """FASTA file with the contents of one of the test cases."""
+    path = tmp_path / 'sequences.fasta'
+    path.write_bytes(FASTA_CASES[request.param])
+    return str(path)
+
+
+def test_read_fasta_file_bytes(fasta_file):
+    """Records match the ones from SimpleFastaParser."""
+    records = [(seq_id, sequence.decode())
+               for seq_id, sequence in sf.read_fasta_file_bytes(fasta_file)]
+
+    assert records == simple_fasta_records(fasta_file)
+
+
+def test_read_fasta_buffer(fasta_file):
+    """Parsing the file contents gives the same records as the file."""
+    with open(fasta_file, 'rb') as infile:
+        data = infile.read()
+
+    expected = list(sf.read_fasta_file_bytes(fasta_file))
+
+    assert list(sf.read_fasta_buffer(data)) == expected
+
+
+def test_fetch_fasta_dict(fasta_file):
+    """Dict values are the sequences as str."""
+    expected = dict(simple_fasta_records(fasta_file))
+
+    assert sf.fetch_fasta_dict(fasta_file, False) == expected
+
+
+def test_fetch_fasta_ids(fasta_file):
+    """Only the headers are scanned, in file order."""
+    expected = [seq_id for seq_id, _ in simple_fasta_records(fasta_file)]
+
+    assert sf.fetch_fasta_ids(fasta_file) == expected